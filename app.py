@@ -3,14 +3,29 @@ from flask_cors import CORS
 from config import Config
 from extensions import db
 from routes import register_routes
+from metrics import init_metrics
+from rollups import init_rollup_commands
+from serializers import FastJSONProvider
+from events import init_events
+from sync import init_sync_commands
+from replicas import configure_replica_binds, init_replicas
+from engines import configure_engines
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(config_class)
 
+    configure_replica_binds(app)
+    configure_engines(app)
     db.init_app(app)
-    CORS(app)
+    CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
+    init_metrics(app)
+    init_events(app)
     register_routes(app)
+    init_replicas(app)
+    init_rollup_commands(app)
+    init_sync_commands(app)
 
     return app
 
@@ -0,0 +1,375 @@
+"""Optional async serving mode.
+
+    uvicorn asgi:create_asgi_app --factory
+
+The hot read routes (GET employee/project/department lists and details,
+without query parameters) are served by native async views on an async
+SQLAlchemy engine, so one process can keep many database waits in flight.
+Every other request (writes, filters, pagination, exports, metrics) is
+passed to the regular Flask app on a pool of ASGI_WSGI_THREADS worker
+threads, so the API surface is identical to `python app.py` and a slow
+request only holds its own thread. The change feed (GET /events) is also
+served natively: an open SSE connection must not pin a worker thread.
+
+The native views read the primary only. With REPLICA_DATABASE_URLS set
+they are switched off and those GETs go to Flask as well, which routes
+them to the replicas (with read-your-writes and fallback) and the lookup
+caches.
+
+Needs the async extras: asgiref, an async driver (aiomysql for MySQL,
+aiosqlite for SQLite) and an ASGI server such as uvicorn.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs
+from sqlalchemy import event, select
+from sqlalchemy.engine import make_url
+
+from app import create_app
+from config import Config
+from engines import engine_options
+from models import Employee, Department, Project, TableVersion, employee_project
+from routes import EMPLOYEE_TABLES, PROJECT_TABLES, DEPARTMENT_TABLES
+from serializers import EMPLOYEE, PROJECT, PROJECT_MEMBER, DEPARTMENT, dump_response_body
+
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+employees = Employee.__table__
+departments = Department.__table__
+projects = Project.__table__
+
+
+def async_database_uri(uri):
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+# -------------------------------
+# Async Views
+# -------------------------------
+# Each view gets an open AsyncConnection plus the path arguments and
+# returns (status, payload). They issue the same batched queries as the
+# sync routes in routes.py. The list views return HAND_OFF for tables
+# longer than `max_rows` (STREAM_ROW_THRESHOLD) instead of building the
+# whole list; the request then goes to Flask, which streams it.
+HAND_OFF = object()
+
+
+def employee_with_projects(row, projects):
+    result = EMPLOYEE.from_row(row)
+    result["projects"] = projects
+    return result
+
+
+async def load_projects_by_employee(conn, employee_id=None):
+    stmt = select(*PROJECT.columns, employee_project.c.employee_id).join(
+        employee_project, projects.c.id == employee_project.c.project_id
+    ).order_by(projects.c.id)
+    if employee_id is not None:
+        stmt = stmt.where(employee_project.c.employee_id == employee_id)
+
+    grouped = defaultdict(list)
+    for row in await conn.execute(stmt):
+        grouped[row.employee_id].append(PROJECT.from_row(row))
+    return grouped
+
+
+async def load_employees_by_project(conn, project_id=None):
+    stmt = select(*PROJECT_MEMBER.columns, employee_project.c.project_id).join(
+        employee_project, employees.c.id == employee_project.c.employee_id
+    ).order_by(employees.c.id)
+    if project_id is not None:
+        stmt = stmt.where(employee_project.c.project_id == project_id)
+
+    grouped = defaultdict(list)
+    for row in await conn.execute(stmt):
+        grouped[row.project_id].append(PROJECT_MEMBER.from_row(row))
+    return grouped
+
+
+async def get_employees(conn, max_rows):
+    rows = (await conn.execute(EMPLOYEE.select().order_by(employees.c.id).limit(max_rows + 1))).all()
+    if len(rows) > max_rows:
+        return HAND_OFF
+    projects_by_employee = await load_projects_by_employee(conn)
+    return 200, [employee_with_projects(e, projects_by_employee.get(e.id, [])) for e in rows]
+
+
+async def get_employee(conn, id):
+    e = (await conn.execute(EMPLOYEE.select().where(employees.c.id == id))).first()
+    if not e:
+        return 404, {"error": "Employee not found"}
+    projects_by_employee = await load_projects_by_employee(conn, id)
+    return 200, employee_with_projects(e, projects_by_employee.get(id, []))
+
+
+async def get_employee_projects(conn, id):
+    e = (await conn.execute(select(employees.c.id).where(employees.c.id == id))).first()
+    if not e:
+        return 404, {"error": "Employee not found"}
+    projects_by_employee = await load_projects_by_employee(conn, id)
+    return 200, projects_by_employee.get(id, [])
+
+
+async def get_projects(conn, max_rows):
+    rows = (await conn.execute(PROJECT.select().order_by(projects.c.id).limit(max_rows + 1))).all()
+    if len(rows) > max_rows:
+        return HAND_OFF
+    employees_by_project = await load_employees_by_project(conn)
+    result = []
+    for p in rows:
+        project = PROJECT.from_row(p)
+        project["employees"] = employees_by_project.get(p.id, [])
+        result.append(project)
+    return 200, result
+
+
+async def get_project(conn, id):
+    p = (await conn.execute(PROJECT.select().where(projects.c.id == id))).first()
+    if not p:
+        return 404, {"error": "Project not found"}
+    project = PROJECT.from_row(p)
+    project["employees"] = (await load_employees_by_project(conn, id)).get(id, [])
+    return 200, project
+
+
+async def get_project_employees(conn, id):
+    p = (await conn.execute(select(projects.c.id).where(projects.c.id == id))).first()
+    if not p:
+        return 404, {"error": "Project not found"}
+    return 200, (await load_employees_by_project(conn, id)).get(id, [])
+
+
+async def get_departments(conn):
+    rows = await conn.execute(DEPARTMENT.select())
+    return 200, [DEPARTMENT.from_row(d) for d in rows]
+
+
+async def get_department(conn, id):
+    d = (await conn.execute(DEPARTMENT.select().where(departments.c.id == id))).first()
+    if not d:
+        return 404, {"error": "Department not found"}
+    return 200, DEPARTMENT.from_row(d)
+
+
+LIST_VIEWS = (get_employees, get_projects)
+
+# (path pattern, view, tables the response depends on, Flask rule the
+# request is reported under in /metrics)
+ASYNC_ROUTES = [
+    (re.compile(r"^/employees$"), get_employees, EMPLOYEE_TABLES, "/employees"),
+    (re.compile(r"^/employees/(\d+)$"), get_employee, EMPLOYEE_TABLES, "/employees/<int:id>"),
+    (re.compile(r"^/employees/(\d+)/projects$"), get_employee_projects, EMPLOYEE_TABLES,
+     "/employees/<int:emp_id>/projects"),
+    (re.compile(r"^/projects$"), get_projects, PROJECT_TABLES, "/projects"),
+    (re.compile(r"^/projects/(\d+)$"), get_project, PROJECT_TABLES, "/projects/<int:id>"),
+    (re.compile(r"^/projects/(\d+)/employees$"), get_project_employees, PROJECT_TABLES,
+     "/projects/<int:project_id>/employees"),
+    (re.compile(r"^/departments$"), get_departments, DEPARTMENT_TABLES, "/departments"),
+    (re.compile(r"^/departments/(\d+)$"), get_department, DEPARTMENT_TABLES, "/departments/<int:id>"),
+]
+
+
+# SQL usage of a native request for /metrics. There is no flask.g here, so
+# it is counted on the connection, which the request holds throughout.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["sql_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["sql_statements"] = conn.info.get("sql_statements", 0) + 1
+    conn.info["sql_time"] = conn.info.get("sql_time", 0.0) + time.perf_counter() - conn.info.pop("sql_start")
+
+
+# -------------------------------
+# WSGI Bridge
+# -------------------------------
+class ThreadPoolWsgi:
+    """Run the Flask app for ASGI requests on a pool of worker threads.
+
+    asgiref's WsgiToAsgi runs every call through sync_to_async with
+    thread_sensitive=True, i.e. on one shared thread, so a single slow
+    request would queue all the others. This reuses its request/response
+    translation but runs each call on `executor`.
+    """
+
+    def __init__(self, wsgi_app, executor):
+        from asgiref.sync import sync_to_async
+        from asgiref.wsgi import WsgiToAsgiInstance
+
+        class PooledInstance(WsgiToAsgiInstance):
+            run_wsgi_app = sync_to_async(
+                WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False, executor=executor
+            )
+
+        self.wsgi_app = wsgi_app
+        self.instance_class = PooledInstance
+
+    async def __call__(self, scope, receive, send):
+        await self.instance_class(self.wsgi_app)(scope, receive, send)
+
+
+# -------------------------------
+# ASGI Application
+# -------------------------------
+class AsyncApp:
+    def __init__(self, flask_app, engine):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.executor = ThreadPoolExecutor(flask_app.config['ASGI_WSGI_THREADS'], thread_name_prefix="wsgi")
+        self.wsgi = ThreadPoolWsgi(flask_app, self.executor)
+        self.native_reads = not flask_app.config['REPLICA_DATABASE_URIS']
+        self.metrics = flask_app.extensions["metrics"]
+        max_rows = flask_app.config['STREAM_ROW_THRESHOLD']
+        self.routes = [
+            (pattern, partial(view, max_rows=max_rows) if view in LIST_VIEWS else view, tables, rule)
+            for pattern, view, tables, rule in ASYNC_ROUTES
+        ]
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+    def match(self, scope):
+        if not self.native_reads or scope["method"] != "GET" or scope.get("query_string"):
+            return None
+        for pattern, view, tables, rule in self.routes:
+            found = pattern.match(scope["path"])
+            if found:
+                return view, [int(arg) for arg in found.groups()], tables, rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+
+        if scope["type"] == "http" and scope["method"] == "GET" and scope["path"] == "/events":
+            await self.events(scope, receive, send)
+            return
+
+        route = self.match(scope) if scope["type"] == "http" else None
+        if route is None:
+            await self.wsgi(scope, receive, send)
+            return
+
+        view, args, tables, rule = route
+        start = time.perf_counter()
+        headers = dict(scope.get("headers") or [])
+        async with self.engine.connect() as conn:
+            conn.info["sql_statements"], conn.info["sql_time"] = 0, 0.0
+            etag = await self.etag(conn, scope["path"], tables)
+            if etag in parse_if_none_match(headers.get(b"if-none-match", b"")):
+                status, payload = 304, None
+            else:
+                result = await view(conn, *args)
+                if result is HAND_OFF:
+                    status = None
+                else:
+                    status, payload = result
+            statements, db_time = conn.info["sql_statements"], conn.info["sql_time"]
+
+        if status is None:
+            await self.wsgi(scope, receive, send)
+            return
+        await self.respond(send, status, payload, etag if status in (200, 304) else None, self.cors_headers(headers))
+        self.metrics.record(rule, "GET", status, time.perf_counter() - start, statements, db_time)
+
+    async def etag(self, conn, path, tables):
+        # Same key as versioning.conditional, so ETags are interchangeable
+        # between the sync and async modes.
+        rows = await conn.execute(
+            select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+        )
+        versions = dict(rows.all())
+        key = f"{path}?|{[versions.get(name, 0) for name in tables]}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def cors_headers(self, request_headers):
+        # Same policy as CORS(app) in app.py: credentials are allowed, so a
+        # listed origin is echoed back instead of "*".
+        origin = request_headers.get(b"origin", b"").decode()
+        if origin not in self.flask_app.config['CORS_ORIGINS']:
+            return [(b"vary", b"Origin")]
+        return [
+            (b"access-control-allow-origin", origin.encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+    async def respond(self, send, status, payload, etag, cors):
+        body = b"" if payload is None else dump_response_body(payload)
+        headers = [(b"content-length", str(len(body)).encode()), *cors]
+        if payload is not None:
+            headers.append((b"content-type", b"application/json"))
+        if etag:
+            headers.append((b"etag", f'"{etag}"'.encode()))
+            headers.append((b"cache-control", b"no-cache"))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def events(self, scope, receive, send):
+        """GET /events, as in events.init_events, until the client disconnects."""
+        feed = self.flask_app.extensions["change_feed"]
+        headers = dict(scope.get("headers") or [])
+        last_event_id = (headers.get(b"last-event-id", b"").decode()
+                         or parse_qs(scope.get("query_string", b"").decode()).get("last_event_id", [None])[0])
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+            *self.cors_headers(headers),
+        ]})
+
+        stream = feed.astream(last_event_id, self.flask_app.config['EVENT_KEEPALIVE_SECONDS'])
+
+        async def forward():
+            async for frame in stream:
+                await send({"type": "http.response.body", "body": frame.encode(), "more_body": True})
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        tasks = [asyncio.ensure_future(forward()), asyncio.ensure_future(disconnected())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await stream.aclose()
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+def parse_if_none_match(value):
+    return {tag.strip().removeprefix("W/").strip('"') for tag in value.decode().split(",") if tag.strip()}
+
+
+def create_asgi_app(config_class=Config):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    flask_app = create_app(config_class)
+    uri = async_database_uri(flask_app.config["SQLALCHEMY_DATABASE_URI"])
+    engine = create_async_engine(uri, **engine_options(uri, flask_app.config, is_async=True))
+    # Reported by /metrics next to the Flask engines.
+    flask_app.extensions["async_engine"] = engine
+    return AsyncApp(flask_app, engine)
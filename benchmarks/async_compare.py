@@ -0,0 +1,187 @@
+"""Compare sync (WSGI) and async (ASGI) serving under mixed traffic.
+
+Usage (from the repository root):
+
+    python -m benchmarks.async_compare --concurrency 32 --requests 400
+    python -m benchmarks.async_compare --mix bridged
+    python -m benchmarks.async_compare --db mysql+pymysql://user:pw@localhost/bench_db
+
+Both modes serve the same seeded database. Sync mode runs the Flask app on
+a thread pool of `--concurrency` workers (like a threaded WSGI server);
+async mode calls the ASGI app directly from one event loop with the
+same number of requests in flight. The traffic interleaves the hot reads
+that asgi.py serves natively ("fast") with filtered and paged reads,
+writes and /metrics, which it hands to the Flask app ("bridged");
+--mix picks one kind or both. Latency is reported per kind. Against
+SQLite there is little I/O to overlap (and concurrent writes can fail
+with "database is locked"), so point --db at a real MySQL server to see
+the difference.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from asgi import create_asgi_app
+from config import Config
+from extensions import db
+from benchmarks.orggen import seed_org
+from benchmarks.run import percentile
+
+# (method, path, JSON body) templates per kind of request.
+ROUTES = {
+    "fast": [
+        ("GET", "/employees", None),
+        ("GET", "/employees/{employee}", None),
+        ("GET", "/projects", None),
+        ("GET", "/projects/{project}", None),
+        ("GET", "/departments", None),
+    ],
+    "bridged": [
+        ("GET", "/employees?department_id={department}", None),
+        ("GET", "/employees?limit=50", None),
+        ("PATCH", "/employees/{employee}", '{{"salary": {salary}}}'),
+        ("POST", "/projects/{project}/assign", '{{"employee_ids": [{employee}]}}'),
+        ("GET", "/metrics", None),
+    ],
+}
+MIXES = {"fast": ["fast"], "bridged": ["bridged"], "all": ["fast", "bridged"]}
+
+
+def build_requests(ids, count, mix):
+    """Return (kind, method, path, body) tuples, alternating the kinds in `mix`."""
+    templates = [(kind, route) for kind in MIXES[mix] for route in ROUTES[kind]]
+    # Interleave the kinds so both are in flight at the same time.
+    templates.sort(key=lambda item: ROUTES[item[0]].index(item[1]))
+    requests = []
+    for i in range(count):
+        kind, (method, path, body) = templates[i % len(templates)]
+        values = {
+            "employee": ids["employees"][i % len(ids["employees"])],
+            "project": ids["projects"][i % len(ids["projects"])],
+            "department": ids["departments"][i % len(ids["departments"])],
+            "salary": 30000 + i,
+        }
+        requests.append((kind, method, path.format(**values), body and json.loads(body.format(**values))))
+    return requests
+
+
+# -------------------------------
+# Sync Mode
+# -------------------------------
+def run_sync(app, requests, concurrency):
+    def fetch(request):
+        kind, method, path, body = request
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        return kind, time.perf_counter() - start, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, requests))
+    return time.perf_counter() - started, results
+
+
+# -------------------------------
+# Async Mode
+# -------------------------------
+async def asgi_request(asgi_app, method, path, body=None):
+    path, _, query = path.partition("?")
+    data = b"" if body is None else json.dumps(body).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())] if data else []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": data, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(scope, receive, send)
+    return messages[0]["status"]
+
+
+async def run_async(asgi_app, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(request):
+        kind, method, path, body = request
+        async with semaphore:
+            start = time.perf_counter()
+            status = await asgi_request(asgi_app, method, path, body)
+            return kind, time.perf_counter() - start, status
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(fetch(request) for request in requests))
+    elapsed = time.perf_counter() - started
+    await asgi_app.engine.dispose()
+    asgi_app.executor.shutdown()
+    return elapsed, results
+
+
+def summarize(mode, elapsed, results):
+    errors = 0
+    for kind in sorted({kind for kind, _, _ in results}):
+        latencies = [latency for k, latency, _ in results if k == kind]
+        failed = sum(1 for k, _, status in results if k == kind and status >= 500)
+        print(f"{mode:<6} {kind:<8} {len(latencies) / elapsed:>10.1f} {percentile(latencies, 50) * 1000:>9.2f} "
+              f"{percentile(latencies, 95) * 1000:>9.2f} {failed:>7}")
+        errors += failed
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLAlchemy URI (defaults to a temporary SQLite file)")
+    parser.add_argument("--employees", type=int, default=2000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="all",
+                        help="Request kinds to send (default: fast and bridged interleaved)")
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    if not args.db:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        args.db = f"sqlite:///{tmp_path}"
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.db
+
+    try:
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            ids = seed_org(employees=args.employees, projects=args.projects)
+        requests = build_requests(ids, args.requests, args.mix)
+
+        print(f"{'mode':<6} {'kind':<8} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+        errors = summarize("sync", *run_sync(app, requests, args.concurrency))
+        errors += summarize("async", *asyncio.run(
+            run_async(create_asgi_app(BenchmarkConfig), requests, args.concurrency)
+        ))
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
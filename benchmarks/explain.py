@@ -0,0 +1,142 @@
+"""Flag full scans in the SQL every API route issues.
+
+Usage (from the repository root):
+
+    python -m benchmarks.explain
+    python -m benchmarks.explain --db mysql+pymysql://user:pw@localhost/bench_db --verbose
+
+Seeds a synthetic org like benchmarks.run, sends each route's scenario
+once while recording the statements it executes, then runs EXPLAIN
+(EXPLAIN QUERY PLAN on SQLite) on every distinct statement. A filtered
+statement (one with a WHERE clause) that still reads a whole table or a
+whole index is reported, and the run exits non-zero, so a new route or
+a dropped index cannot silently add a full scan. Statements without a
+WHERE clause read everything by design (unpaginated lists, the
+snapshot, the export) and are not flagged.
+"""
+import argparse
+import re
+import sys
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from extensions import db
+from benchmarks.orggen import seed_org
+from benchmarks.run import SCENARIOS, BenchmarkContext
+
+EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT\b.*\bSELECT\b)", re.IGNORECASE | re.DOTALL)
+FILTERED = re.compile(r"\bWHERE\b", re.IGNORECASE)
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?( USING (?:COVERING )?INDEX \w+)?$")
+
+# (method, rule, table) -> why a filtered full scan of that table is
+# deliberate. Only add routes where no index can help.
+ALLOWED_SCANS = {
+    ("GET", "/employees/available", "employees"):
+        "anti-join: every employee without an overlapping project is part of the answer",
+}
+
+
+# -------------------------------
+# Statement Capture
+# -------------------------------
+class StatementRecorder:
+    def __init__(self, engine):
+        self.statements = {}
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if EXPLAINABLE.match(statement) and statement not in self.statements:
+            self.statements[statement] = parameters[0] if executemany else parameters
+
+    def take(self):
+        statements, self.statements = self.statements, {}
+        return statements
+
+
+# -------------------------------
+# Plans
+# -------------------------------
+def explain(conn, statement, parameters):
+    """Return (plan lines, full scans as (table, kind)) for one statement."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        lines = [row[-1] for row in rows]
+        scans = []
+        for line in lines:
+            match = SQLITE_SCAN.match(line)
+            if match:
+                scans.append((match.group(1), "index" if match.group(2) else "table"))
+        return lines, scans
+
+    rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+    lines = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}"
+             for row in rows]
+    kinds = {"ALL": "table", "index": "index"}
+    scans = [(row["table"], kinds[row["type"]]) for row in rows if row["type"] in kinds]
+    return lines, scans
+
+
+def shorten(statement, width=400):
+    statement = re.sub(r"(\((?:\?, )*\?\), )+", "(...), ", statement)
+    return statement if len(statement) <= width else statement[:width] + " ..."
+
+
+def flagged_scans(method, rule, statement, scans):
+    if not FILTERED.search(statement):
+        return []
+    return [(table, kind) for table, kind in scans if (method, rule, table) not in ALLOWED_SCANS]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="sqlite://", help="SQLAlchemy URI of a scratch database")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="Check only routes whose rule contains this text")
+    parser.add_argument("--verbose", action="store_true", help="Print the plan of every statement")
+    args = parser.parse_args(argv)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.db
+
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    problems = 0
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ids = seed_org(args.departments, args.employees, args.projects, seed=args.seed)
+        ctx = BenchmarkContext(ids, args.seed)
+        recorder = StatementRecorder(db.engine)
+
+        for (method, rule), prepare in SCENARIOS.items():
+            if prepare is None or (args.only and args.only not in rule):
+                continue
+            path, kwargs = prepare(ctx)
+            recorder.take()
+            client.open(path, method=method, **kwargs).get_data()
+            statements = recorder.take()
+
+            with db.engine.connect() as conn:
+                for statement, parameters in statements.items():
+                    lines, scans = explain(conn, statement, parameters)
+                    flagged = flagged_scans(method, rule, statement, scans)
+                    if not (flagged or args.verbose):
+                        continue
+                    problems += bool(flagged)
+                    status = "FULL SCAN " + ", ".join(f"{t} ({k})" for t, k in flagged) if flagged else "ok"
+                    print(f"{method} {rule}: {status}")
+                    print("    " + shorten(" ".join(statement.split())))
+                    for line in lines:
+                        print(f"      {line}")
+
+    print(f"{problems} filtered statement(s) with full scans", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import random
+import string
+from datetime import date, timedelta
+from extensions import db
+from models import Employee, Department, Project, employee_project
+from rollups import rebuild_rollups
+
+FIRST_NAMES = [
+    "Asha", "Ben", "Chen", "Divya", "Elena", "Farid", "Grace", "Hiro", "Isha", "Jonas",
+    "Kavya", "Liam", "Maya", "Nikhil", "Olga", "Priya", "Quinn", "Ravi", "Sara", "Tomas",
+]
+LAST_NAMES = [
+    "Rao", "Smith", "Iyer", "Garcia", "Nair", "Kim", "Patel", "Ivanova", "Khan", "Brown",
+    "Menon", "Silva", "Das", "Mueller", "Shetty", "Lopez", "Reddy", "Sato", "Joshi", "Clark",
+]
+LOCATIONS = ["Bengaluru", "Mysuru", "Pune", "Hyderabad", "Chennai", "Remote"]
+
+
+# -------------------------------
+# Synthetic Org Generator
+# -------------------------------
+def _code(rng, length, used):
+    while True:
+        code = "".join(rng.choices(string.ascii_uppercase + string.digits, k=length))
+        if code not in used:
+            used.add(code)
+            return code
+
+
+def seed_org(departments=20, employees=5000, projects=200, assignments_per_employee=3,
+             seed=42, batch_size=1000):
+    """Populate the current app's database with a reproducible synthetic org.
+
+    Rows are written through the real models/tables in executemany batches,
+    then the department rollups are rebuilt to match.
+    `assignments_per_employee` is the mean number of projects per employee
+    (each employee gets 0..2x that many, capped at the number of projects).
+    Returns the generated ids so scenarios can pick existing rows.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+
+    dept_codes = set()
+    db.session.execute(Department.__table__.insert(), [
+        {"name": f"Department {i}", "location": rng.choice(LOCATIONS),
+         "dept_code": _code(rng, 4, dept_codes)}
+        for i in range(departments)
+    ])
+    dept_ids = [row.id for row in db.session.query(Department.id)]
+
+    project_codes = set()
+    project_rows = []
+    for i in range(projects):
+        start = today - timedelta(days=rng.randint(0, 3 * 365))
+        project_rows.append({
+            "title": f"Project {i}",
+            "description": f"Synthetic project {i} for benchmarking",
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(30, 540)),
+            "project_code": _code(rng, 5, project_codes),
+        })
+    db.session.execute(Project.__table__.insert(), project_rows)
+    project_ids = [row.id for row in db.session.query(Project.id)]
+
+    for offset in range(0, employees, batch_size):
+        db.session.execute(Employee.__table__.insert(), [
+            {
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "email": f"employee{i}@example.com",
+                "salary": float(rng.randint(30, 250) * 1000),
+                "join_date": today - timedelta(days=rng.randint(1, 15 * 365)),
+                "department_id": rng.choice(dept_ids) if dept_ids else None,
+            }
+            for i in range(offset, min(offset + batch_size, employees))
+        ])
+    employee_ids = [row.id for row in db.session.query(Employee.id)]
+
+    max_per_employee = min(2 * assignments_per_employee, len(project_ids))
+    edges = []
+    for employee_id in employee_ids:
+        count = rng.randint(0, max_per_employee)
+        for project_id in rng.sample(project_ids, count):
+            edges.append({"employee_id": employee_id, "project_id": project_id})
+            if len(edges) >= batch_size:
+                db.session.execute(employee_project.insert(), edges)
+                edges = []
+    if edges:
+        db.session.execute(employee_project.insert(), edges)
+
+    db.session.commit()
+    rebuild_rollups()
+    return {"departments": dept_ids, "employees": employee_ids, "projects": project_ids}
@@ -0,0 +1,338 @@
+"""Benchmark every API route against a seeded local database.
+
+Usage (from the repository root):
+
+    python -m benchmarks.run --employees 5000 --projects 200
+    python -m benchmarks.run --json bench.json
+    python -m benchmarks.run --baseline bench.json --tolerance 0.25
+
+For each route it reports p50/p95 latency, SQL statements per request and
+peak Python memory allocated while serving one request (median queries,
+since a route may occasionally do one-off work such as creating a row). With --baseline
+the run exits non-zero when a route got slower than the tolerance allows
+or issues more queries than before.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Employee, Department, Project
+from benchmarks.orggen import seed_org
+
+
+# -------------------------------
+# Scenario Context
+# -------------------------------
+class BenchmarkContext:
+    def __init__(self, ids, seed):
+        self.ids = ids
+        self.rng = random.Random(seed)
+        self.counter = 0
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    def employee_id(self):
+        return self.rng.choice(self.ids["employees"])
+
+    def employee_ids(self, count):
+        return self.rng.sample(self.ids["employees"], min(count, len(self.ids["employees"])))
+
+    def department_id(self):
+        return self.rng.choice(self.ids["departments"])
+
+    def project_id(self):
+        return self.rng.choice(self.ids["projects"])
+
+    # A random quarter-long window within the seeded project dates.
+    def window(self):
+        start = date.today() - timedelta(days=self.rng.randint(0, 730))
+        return f"from={start}&to={start + timedelta(days=90)}"
+
+    def salary(self):
+        return float(self.rng.randint(30, 250) * 1000)
+
+    # Rows created outside the timed request, for routes that destroy data.
+    def throwaway_employee(self):
+        emp = Employee(name="Temp Employee", email=f"temp{self.unique()}@example.com",
+                       salary=1000.0, join_date=date.today())
+        db.session.add(emp)
+        db.session.commit()
+        return emp.id
+
+    def throwaway_employees(self, count):
+        emps = [Employee(name="Temp Employee", email=f"temp{self.unique()}@example.com",
+                         salary=1000.0, join_date=date.today()) for _ in range(count)]
+        db.session.add_all(emps)
+        db.session.commit()
+        return [emp.id for emp in emps]
+
+    def staffed_department(self, count):
+        dept = Department(name="Temp Department")
+        db.session.add(dept)
+        db.session.flush()
+        db.session.add_all([
+            Employee(name="Temp Employee", email=f"temp{self.unique()}@example.com",
+                     salary=1000.0, join_date=date.today(), department_id=dept.id)
+            for _ in range(count)
+        ])
+        db.session.commit()
+        return dept.id
+
+    def throwaway_project(self):
+        project = Project(title="Temp Project", description="Temp", start_date=date.today())
+        db.session.add(project)
+        db.session.commit()
+        return project.id
+
+
+def new_employee(ctx):
+    return {
+        "name": "Bench Employee",
+        "email": f"bench{ctx.unique()}@example.com",
+        "salary": ctx.salary(),
+        "join_date": str(date.today() - timedelta(days=30)),
+        "department_id": ctx.department_id(),
+    }
+
+
+def new_project():
+    return {
+        "title": "Bench Project",
+        "description": "Created by the benchmark",
+        "start_date": str(date.today()),
+        "end_date": str(date.today() + timedelta(days=90)),
+    }
+
+
+# -------------------------------
+# Scenarios
+# -------------------------------
+# (method, url rule) -> callable(ctx) returning (path, request kwargs)
+SCENARIOS = {
+    ("GET", "/"): lambda ctx: ("/", {}),
+    ("GET", "/metrics"): lambda ctx: ("/metrics", {}),
+    ("GET", "/cache/stats"): lambda ctx: ("/cache/stats", {}),
+
+    ("POST", "/employees"): lambda ctx: ("/employees", {"json": new_employee(ctx)}),
+    ("POST", "/employees/bulk"): lambda ctx: (
+        "/employees/bulk", {"json": [new_employee(ctx) for _ in range(100)]}
+    ),
+    ("GET", "/employees"): lambda ctx: ("/employees", {}),
+    ("GET", "/employees/export"): lambda ctx: ("/employees/export?format=csv", {}),
+    ("GET", "/employees/<int:id>"): lambda ctx: (f"/employees/{ctx.employee_id()}", {}),
+    ("PUT", "/employees/<int:id>"): lambda ctx: (
+        f"/employees/{ctx.employee_id()}", {"json": {"salary": ctx.salary()}}
+    ),
+    ("PATCH", "/employees/<int:id>"): lambda ctx: (
+        f"/employees/{ctx.employee_id()}", {"json": {"salary": ctx.salary()}}
+    ),
+    ("PATCH", "/employees"): lambda ctx: (
+        "/employees?ids=" + ",".join(map(str, ctx.employee_ids(100))),
+        {"json": {"salary": ctx.salary(), "department_id": ctx.department_id()}}
+    ),
+    ("DELETE", "/employees/<int:id>"): lambda ctx: (f"/employees/{ctx.throwaway_employee()}", {}),
+    ("DELETE", "/employees"): lambda ctx: (
+        "/employees?ids=" + ",".join(map(str, ctx.throwaway_employees(100))), {}
+    ),
+    ("GET", "/employees/<int:emp_id>/projects"): lambda ctx: (
+        f"/employees/{ctx.employee_id()}/projects", {}
+    ),
+
+    ("POST", "/departments"): lambda ctx: (
+        "/departments", {"json": {"name": "Bench Department", "location": "Remote"}}
+    ),
+    ("GET", "/departments"): lambda ctx: ("/departments", {}),
+    ("GET", "/departments/<int:id>"): lambda ctx: (f"/departments/{ctx.department_id()}", {}),
+    ("GET", "/departments/stats"): lambda ctx: ("/departments/stats", {}),
+    ("GET", "/departments/<int:id>/stats"): lambda ctx: (f"/departments/{ctx.department_id()}/stats", {}),
+    ("PUT", "/departments/<int:id>"): lambda ctx: (
+        f"/departments/{ctx.department_id()}", {"json": {"location": f"Floor {ctx.unique()}"}}
+    ),
+    ("PATCH", "/departments/<int:id>"): lambda ctx: (
+        f"/departments/{ctx.department_id()}", {"json": {"location": f"Floor {ctx.unique()}"}}
+    ),
+    ("POST", "/departments/<int:id>/transfer"): lambda ctx: (
+        f"/departments/{ctx.staffed_department(100)}/transfer", {"json": {"department_id": ctx.department_id()}}
+    ),
+    ("DELETE", "/departments/<int:id>"): lambda ctx: (f"/departments/{ctx.staffed_department(100)}", {}),
+
+    ("POST", "/projects"): lambda ctx: ("/projects", {"json": new_project()}),
+    ("GET", "/projects"): lambda ctx: ("/projects", {}),
+    ("GET", "/projects/<int:id>"): lambda ctx: (f"/projects/{ctx.project_id()}", {}),
+    ("PUT", "/projects/<int:id>"): lambda ctx: (
+        f"/projects/{ctx.project_id()}", {"json": {"description": f"Revision {ctx.unique()}"}}
+    ),
+    ("PATCH", "/projects/<int:id>"): lambda ctx: (
+        f"/projects/{ctx.project_id()}", {"json": {"description": f"Revision {ctx.unique()}"}}
+    ),
+    ("DELETE", "/projects/<int:id>"): lambda ctx: (f"/projects/{ctx.throwaway_project()}", {}),
+    ("POST", "/projects/<int:project_id>/assign"): lambda ctx: (
+        f"/projects/{ctx.project_id()}/assign", {"json": {"employee_ids": ctx.employee_ids(20)}}
+    ),
+    ("POST", "/projects/<int:project_id>/unassign"): lambda ctx: (
+        f"/projects/{ctx.project_id()}/unassign", {"json": {"employee_ids": ctx.employee_ids(20)}}
+    ),
+    ("GET", "/projects/<int:project_id>/employees"): lambda ctx: (
+        f"/projects/{ctx.project_id()}/employees", {}
+    ),
+
+    ("GET", "/snapshot"): lambda ctx: ("/snapshot", {}),
+
+    ("GET", "/projects/overlapping"): lambda ctx: (f"/projects/overlapping?{ctx.window()}", {}),
+    ("GET", "/employees/available"): lambda ctx: (f"/employees/available?{ctx.window()}", {}),
+    ("GET", "/employees/allocation"): lambda ctx: (f"/employees/allocation?{ctx.window()}", {}),
+
+    # Endless SSE stream: there is no response to time, so it is only
+    # listed here to mark it as deliberately not benchmarked.
+    ("GET", "/events"): None,
+}
+
+
+# -------------------------------
+# Measurement
+# -------------------------------
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def uncovered_routes(app):
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        for method in sorted(rule.methods - {"HEAD", "OPTIONS"}):
+            if (method, rule.rule) not in SCENARIOS:
+                missing.append(f"{method} {rule.rule}")
+    return missing
+
+
+def run_scenario(client, ctx, counter, method, prepare, iterations):
+    latencies = []
+    queries = []
+    failures = 0
+
+    for _ in range(iterations):
+        path, kwargs = prepare(ctx)
+        counter.count = 0
+        start = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        response.get_data()
+        latencies.append(time.perf_counter() - start)
+        queries.append(counter.count)
+        if response.status_code >= 500:
+            failures += 1
+
+    path, kwargs = prepare(ctx)
+    tracemalloc.start()
+    client.open(path, method=method, **kwargs).get_data()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "queries": percentile(queries, 50),
+        "peak_kib": round(peak / 1024, 1),
+        "failures": failures,
+    }
+
+
+# Sub-millisecond p95 swings are timer noise, not regressions.
+MIN_REGRESSION_MS = 1.0
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        slower = current["p95_ms"] - previous["p95_ms"]
+        if slower > previous["p95_ms"] * tolerance and slower > MIN_REGRESSION_MS:
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="sqlite://", help="SQLAlchemy URI of a scratch database")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=5000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--assignments-per-employee", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="Run only routes whose rule contains this text")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against results from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown vs baseline")
+    args = parser.parse_args(argv)
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.db
+
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        ids = seed_org(args.departments, args.employees, args.projects,
+                       args.assignments_per_employee, seed=args.seed)
+        ctx = BenchmarkContext(ids, args.seed)
+        counter = QueryCounter(db.engine)
+
+        for name in uncovered_routes(app):
+            print(f"warning: no benchmark scenario for {name}", file=sys.stderr)
+
+        results = {}
+        print(f"{'route':<48} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8} {'peak KiB':>10}")
+        for (method, rule), prepare in SCENARIOS.items():
+            if prepare is None or (args.only and args.only not in rule):
+                continue
+            name = f"{method} {rule}"
+            results[name] = stats = run_scenario(client, ctx, counter, method, prepare, args.iterations)
+            flag = "  FAILED" if stats["failures"] else ""
+            print(f"{name:<48} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+                  f"{stats['queries']:>8} {stats['peak_kib']:>10}{flag}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+
+    failed = any(stats["failures"] for stats in results.values())
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        failed = failed or bool(regressions)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Measure the cost of serializing a large GET /employees response.
+
+Usage (from the repository root):
+
+    python -m benchmarks.serialization --employees 50000
+    python -m benchmarks.serialization --db mysql+pymysql://user:pw@localhost/bench_db
+
+Compares, on the same seeded database:
+
+  * loading:  ORM objects + hand-built dicts vs. column rows + the compiled
+              serializer from serializers.py
+  * encoding: Flask's stdlib JSON provider vs. FastJSONProvider (orjson,
+              when installed)
+  * end to end: the full GET /employees request under each JSON provider,
+              then buffered (?stream=0) vs. streamed (?stream=1, plain and
+              gzipped) with the peak Python memory of one request
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import Employee
+from serializers import EMPLOYEE, FastJSONProvider, orjson
+from benchmarks.orggen import seed_org
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+# -------------------------------
+# Loading
+# -------------------------------
+def load_orm():
+    # The hand-written serializer the routes used before serializers.py.
+    return [{
+        "id": e.id,
+        "name": e.name,
+        "email": e.email,
+        "salary": e.salary,
+        "join_date": str(e.join_date),
+        "department_id": e.department_id,
+    } for e in Employee.query.all()]
+
+
+def load_compiled():
+    return [EMPLOYEE.from_row(row) for row in db.session.execute(EMPLOYEE.select())]
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLAlchemy URI (defaults to a temporary SQLite file)")
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    if not args.db:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        args.db = f"sqlite:///{tmp_path}"
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.db
+
+    try:
+        app = create_app(BenchmarkConfig)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed_org(employees=args.employees, projects=args.projects)
+
+            stdlib = DefaultJSONProvider(app)
+            fast = FastJSONProvider(app)
+            rows = load_compiled()
+            assert rows == load_orm()
+
+            results = [
+                ("load: orm + dict", timed(lambda: (load_orm(), db.session.expunge_all()), args.repeat)),
+                ("load: rows + compiled", timed(load_compiled, args.repeat)),
+                ("encode: stdlib json", timed(lambda: stdlib.response(rows), args.repeat)),
+                ("encode: " + ("orjson" if orjson else "stdlib (orjson missing)"),
+                 timed(lambda: fast.response(rows), args.repeat)),
+            ]
+
+        client = app.test_client()
+        for name, provider in (("stdlib", stdlib), ("fast", fast)):
+            app.json = provider
+            response = client.get("/employees")
+            assert response.status_code == 200
+            seconds = timed(lambda: client.get("/employees").get_data(), args.repeat)
+            results.append((f"GET /employees: {name}", seconds, len(response.get_data())))
+
+        for name, query, headers in (
+            ("buffered", "?stream=0", {}),
+            ("streamed", "?stream=1", {}),
+            ("streamed + gzip", "?stream=1", {"Accept-Encoding": "gzip"}),
+        ):
+            fetch = lambda: client.get("/employees" + query, headers=headers).get_data()
+            size = len(fetch())
+            seconds = timed(fetch, args.repeat)
+            results.append((f"GET /employees {name}", seconds, size, peak_memory(fetch)))
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    print(f"{args.employees} employees, median of {args.repeat} runs")
+    print(f"{'stage':<36} {'ms':>10} {'bytes':>12} {'peak KiB':>10}")
+    for name, seconds, *extra in results:
+        size, peak = (extra + [None, None])[:2]
+        print(f"{name:<36} {seconds * 1000:>10.1f} {size if size is not None else '':>12} "
+              f"{peak // 1024 if peak is not None else '':>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
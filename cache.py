@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+# -------------------------------
+# TTL + LRU Cache
+# -------------------------------
+class LRUCache:
+    """Small thread-safe in-process cache with per-entry TTL and LRU eviction.
+
+    Values are stored as-is, so callers should cache plain serialized data
+    (dicts/lists) rather than ORM instances bound to a session.
+
+    An entry can be stored with a `version` (e.g. the table version it was
+    read at); a lookup with a different version is a miss, so an entry
+    another process has made stale is never served.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= self.clock() or entry[1] != version:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, version=None):
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, version=None):
+        """Return the cached value, or call `loader` and cache its result.
+        A loader returning None (e.g. row not found) is not cached."""
+        value = self.get(key, version)
+        if value is MISSING:
+            value = loader()
+            if value is not None:
+                self.set(key, value, version)
+        return value
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl
+            }
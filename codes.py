@@ -0,0 +1,92 @@
+import string
+import threading
+from math import gcd
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+
+ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTHS = {"dept_code": 4, "project_code": 5}
+BLOCK_SIZE = 32
+
+
+# -------------------------------
+# Code Allocator
+# -------------------------------
+class CodeAllocator:
+    """Hands out unique fixed-length codes without querying per attempt.
+
+    Every code is the image of a sequence number under a fixed bijection of
+    the code space (an affine permutation mod 36**length), so distinct
+    sequence numbers always give distinct codes while consecutive ones
+    still look unrelated. Sequence numbers are reserved from the
+    code_sequences table in blocks with a single atomic UPDATE, which keeps
+    several worker processes from ever drawing the same number.
+    """
+
+    def __init__(self, name, length, block_size=BLOCK_SIZE):
+        self.name = name
+        self.length = length
+        self.block_size = block_size
+        self.space = len(ALPHABET) ** length
+        self.multiplier = self._coprime(int(self.space * 0.6180339887))
+        self.offset = self.space // 3
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def _coprime(self, value):
+        while gcd(value, self.space) != 1:
+            value += 1
+        return value
+
+    def encode(self, number):
+        permuted = (number * self.multiplier + self.offset) % self.space
+        chars = []
+        for _ in range(self.length):
+            permuted, digit = divmod(permuted, len(ALPHABET))
+            chars.append(ALPHABET[digit])
+        return "".join(reversed(chars))
+
+    def allocate(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._next, self._end = self._reserve_block()
+            number = self._next
+            self._next += 1
+        return self.encode(number)
+
+    def _reserve_block(self):
+        from models import CodeSequence
+
+        table = CodeSequence.__table__
+        while True:
+            try:
+                with db.engine.begin() as conn:
+                    updated = conn.execute(
+                        table.update()
+                        .where(table.c.name == self.name)
+                        .values(next_value=table.c.next_value + self.block_size)
+                    ).rowcount
+                    if updated:
+                        end = conn.execute(
+                            db.select(table.c.next_value).where(table.c.name == self.name)
+                        ).scalar_one()
+                    else:
+                        end = self.block_size
+                        conn.execute(table.insert().values(name=self.name, next_value=end))
+            except IntegrityError:
+                # Another worker created the sequence row first; take a block from it.
+                continue
+
+            start = end - self.block_size
+            if start >= self.space:
+                raise RuntimeError(f"{self.name} code space exhausted")
+            return start, min(end, self.space)
+
+
+def allocate_code(name):
+    allocators = current_app.extensions.setdefault("code_allocators", {})
+    if name not in allocators:
+        allocators[name] = CodeAllocator(name, CODE_LENGTHS[name])
+    return allocators[name].allocate()
@@ -0,0 +1,159 @@
+import threading
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Connection acquire time buckets (seconds). Most checkouts are instant;
+# the tail shows the pool running dry.
+ACQUIRE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+MYSQL_TIMEOUTS = {
+    "DB_CONNECT_TIMEOUT": "connect_timeout",
+    "DB_READ_TIMEOUT": "read_timeout",
+    "DB_WRITE_TIMEOUT": "write_timeout",
+}
+# aiomysql only takes a connect timeout.
+ASYNC_MYSQL_TIMEOUTS = {
+    "DB_CONNECT_TIMEOUT": "connect_timeout",
+}
+
+
+# -------------------------------
+# Pool Statistics
+# -------------------------------
+class AcquireStats:
+    """How long callers waited for a connection from one pool."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(ACQUIRE_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.timeouts += timed_out
+            for i, bound in enumerate(ACQUIRE_BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "buckets": list(zip(ACQUIRE_BUCKETS, self.bucket_counts)),
+                "count": self.count,
+                "total": self.total,
+                "max": self.max,
+                "timeouts": self.timeouts,
+            }
+
+
+class TimedPool:
+    """Pool mixin that records how long each checkout waited.
+
+    The time covers waiting for a free connection and opening a new one,
+    i.e. everything between asking the pool and getting a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquire_stats = AcquireStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            timed_out = True
+            raise
+        finally:
+            self.acquire_stats.record(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        # Engine.dispose() swaps in a fresh pool; keep the history.
+        pool = super().recreate()
+        pool.acquire_stats = self.acquire_stats
+        return pool
+
+
+class TimedQueuePool(TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPool, AsyncAdaptedQueuePool):
+    """For create_async_engine, which needs an asyncio-compatible queue."""
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    if isinstance(pool, TimedPool):
+        stats["acquire"] = pool.acquire_stats.snapshot()
+    return stats
+
+
+# -------------------------------
+# Engine Options
+# -------------------------------
+def uses_queue_pool(url):
+    # In-memory SQLite keeps one connection per thread; sizing options do
+    # not apply to it.
+    return not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"))
+
+
+def engine_options(uri, config, is_async=False):
+    """SQLAlchemy engine options for `uri` from the DB_* config values.
+
+    Pass is_async=True for create_async_engine (asgi.py).
+    """
+    url = make_url(uri)
+    options = {
+        "pool_pre_ping": config['DB_POOL_PRE_PING'],
+        "pool_recycle": config['DB_POOL_RECYCLE'],
+    }
+    if uses_queue_pool(url):
+        options.update({
+            "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+            "pool_size": config['DB_POOL_SIZE'],
+            "max_overflow": config['DB_MAX_OVERFLOW'],
+            "pool_timeout": config['DB_POOL_TIMEOUT'],
+        })
+    if url.get_backend_name() == "mysql":
+        timeouts = ASYNC_MYSQL_TIMEOUTS if is_async else MYSQL_TIMEOUTS
+        options["connect_args"] = {
+            arg: config[key] for key, arg in timeouts.items() if config.get(key) is not None
+        }
+    return options
+
+
+def configure_engines(app):
+    """Fill SQLALCHEMY_ENGINE_OPTIONS and per-bind options from the config.
+
+    Must run before db.init_app, after the replica binds are registered.
+    Explicit SQLALCHEMY_ENGINE_OPTIONS entries win over the DB_* values.
+    """
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    binds = {}
+    for key, bind in (app.config.get('SQLALCHEMY_BINDS') or {}).items():
+        bind = {"url": bind} if isinstance(bind, str) else dict(bind)
+        binds[key] = {**engine_options(bind["url"], app.config), **bind}
+    app.config['SQLALCHEMY_BINDS'] = binds
+
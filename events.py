@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from collections import deque
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event
+from extensions import db
+from versioning import get_versions
+
+RECONNECT_DELAY_MS = 3000
+
+
+# -------------------------------
+# Change Feed
+# -------------------------------
+class ChangeFeed:
+    """Bounded in-memory log of committed changes, fanned out over SSE.
+
+    Event ids are "<boot>:<seq>": the boot token changes when the process
+    restarts, so a client resuming with an id from an older process (or one
+    that has already fallen out of the buffer) is told to reset instead of
+    silently missing changes.
+    """
+
+    def __init__(self, maxsize):
+        self.boot = uuid.uuid4().hex[:8]
+        self._events = deque(maxlen=maxsize)
+        self._seq = itertools.count(1)
+        self._condition = threading.Condition()
+        # (loop, asyncio.Event) of every astream() waiting for a change.
+        self._waiters = set()
+
+    def publish(self, records):
+        with self._condition:
+            for record in records:
+                seq = next(self._seq)
+                record = dict(record, event_id=f"{self.boot}:{seq}")
+                data = json.dumps(record, sort_keys=True, separators=(",", ":"))
+                self._events.append((seq, f"id: {record['event_id']}\nevent: change\ndata: {data}\n\n"))
+            self._condition.notify_all()
+            for loop, changed in self._waiters:
+                try:
+                    loop.call_soon_threadsafe(changed.set)
+                except RuntimeError:
+                    pass  # loop already closed; its stream is going away
+
+    def _parse(self, last_event_id):
+        """Return the sequence number to resume after, or None to reset."""
+        if not last_event_id:
+            return self.latest()
+        boot, _, seq = last_event_id.partition(":")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._events[0][0] if self._events else self.latest() + 1
+        if seq < oldest - 1 or seq > self.latest():
+            return None
+        return seq
+
+    def latest(self):
+        return self._events[-1][0] if self._events else 0
+
+    def since(self, seq):
+        return [frame for event_seq, frame in self._events if event_seq > seq]
+
+    def _start(self, last_event_id):
+        """Return (sequence number to stream after, first frame)."""
+        with self._condition:
+            seq = self._parse(last_event_id)
+            if seq is not None:
+                return seq, f"retry: {RECONNECT_DELAY_MS}\n\n"
+            seq = self.latest()
+        return seq, f"retry: {RECONNECT_DELAY_MS}\nid: {self.boot}:{seq}\nevent: reset\ndata: {{}}\n\n"
+
+    def stream(self, last_event_id, keepalive):
+        # The first frame goes out immediately so the response headers are
+        # flushed to the client without waiting for a change.
+        # Never yield while holding the lock: the generator may be resumed
+        # on another thread.
+        seq, first = self._start(last_event_id)
+        yield first
+
+        while True:
+            with self._condition:
+                frames = self.since(seq)
+                if not frames:
+                    self._condition.wait(keepalive)
+                    frames = self.since(seq)
+                seq = self.latest()
+            if frames:
+                yield "".join(frames)
+            else:
+                yield ": keepalive\n\n"
+
+    async def astream(self, last_event_id, keepalive):
+        """stream() for an event loop: waits for changes without holding a
+        thread, so any number of clients can be connected (see asgi.py)."""
+        changed = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), changed)
+        with self._condition:
+            self._waiters.add(waiter)
+        try:
+            seq, first = self._start(last_event_id)
+            yield first
+
+            while True:
+                # Cleared before looking, so a publish after the check still
+                # wakes the wait below.
+                changed.clear()
+                with self._condition:
+                    frames = self.since(seq)
+                    seq = self.latest()
+                if frames:
+                    yield "".join(frames)
+                    continue
+                try:
+                    await asyncio.wait_for(changed.wait(), keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+
+
+# -------------------------------
+# Recording Changes
+# -------------------------------
+def record_change(entity, operation, ids, **extra):
+    """Queue a change event for the current transaction.
+
+    `entity` is the table that changed; queued events are published with
+    that table's version once the transaction commits, and dropped if it
+    rolls back.
+    """
+    db.session.info.setdefault("pending_changes", []).append(
+        {"entity": entity, "op": operation, "ids": list(ids), **extra}
+    )
+
+
+def _before_commit(session):
+    pending = session.info.get("pending_changes")
+    if pending:
+        tables = sorted({change["entity"] for change in pending})
+        versions = dict(zip(tables, get_versions(tables)))
+        for change in pending:
+            change["version"] = versions[change["entity"]]
+
+
+def _after_commit(session):
+    pending = session.info.pop("pending_changes", None)
+    if pending and has_app_context() and "change_feed" in current_app.extensions:
+        current_app.extensions["change_feed"].publish(pending)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    session.info.pop("pending_changes", None)
+
+
+def init_events(app):
+    feed = ChangeFeed(app.config['EVENT_BUFFER_SIZE'])
+    app.extensions["change_feed"] = feed
+
+    if not event.contains(db.session, "after_commit", _after_commit):
+        event.listen(db.session, "before_commit", _before_commit)
+        event.listen(db.session, "after_commit", _after_commit)
+        event.listen(db.session, "after_soft_rollback", _after_soft_rollback)
+
+    @app.route("/events")
+    def events():
+        # EventSource sends Last-Event-ID on reconnect; a first connection
+        # can pass the id it last saw as ?last_event_id=.
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+        return Response(
+            feed.stream(last_event_id, app.config['EVENT_KEEPALIVE_SECONDS']),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+from extensions import db
+from models import Employee, Department, Project, employee_project
+
+EXPORT_COLUMNS = [
+    "id", "name", "email", "salary", "join_date",
+    "department_id", "dept_code", "project_codes"
+]
+
+
+# -------------------------------
+# Row Source
+# -------------------------------
+def iter_employee_records(chunk_size):
+    """Yield one flat record per employee, reading a server-side cursor.
+
+    Employees are joined to their department and projects in a single
+    query ordered by employee id, so the project codes of one employee
+    arrive on consecutive rows and can be folded without holding more
+    than one employee in memory. Only the primary key is sorted on, so
+    the database can read employees in index order and send the first
+    row at once; each employee's codes are sorted here instead.
+    """
+    stmt = (
+        db.select(
+            Employee.id, Employee.name, Employee.email, Employee.salary,
+            Employee.join_date, Employee.department_id,
+            Department.dept_code, Project.project_code
+        )
+        .outerjoin(Department, Department.id == Employee.department_id)
+        .outerjoin(employee_project, employee_project.c.employee_id == Employee.id)
+        .outerjoin(Project, Project.id == employee_project.c.project_id)
+        .order_by(Employee.id)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+
+    current = None
+    for row in db.session.execute(stmt):
+        if current is None or current["id"] != row.id:
+            if current is not None:
+                current["project_codes"].sort()
+                yield current
+            current = {
+                "id": row.id,
+                "name": row.name,
+                "email": row.email,
+                "salary": row.salary,
+                "join_date": str(row.join_date),
+                "department_id": row.department_id,
+                "dept_code": row.dept_code,
+                "project_codes": []
+            }
+        if row.project_code:
+            current["project_codes"].append(row.project_code)
+
+    if current is not None:
+        current["project_codes"].sort()
+        yield current
+
+
+# -------------------------------
+# Encoders
+# -------------------------------
+def generate_csv(records, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    for count, record in enumerate(records, start=1):
+        record["project_codes"] = ";".join(record["project_codes"])
+        writer.writerow([record[column] for column in EXPORT_COLUMNS])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def generate_ndjson(records, chunk_size):
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record))
+        if len(lines) >= chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (generate_csv, "text/csv"),
+    "ndjson": (generate_ndjson, "application/x-ndjson"),
+}
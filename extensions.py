@@ -1,3 +1,22 @@
+from flask import g, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 
-db = SQLAlchemy()
+
+class RoutingSession(Session):
+    """Sends reads to the replica picked for the current request, if any.
+
+    replicas.py sets `g.db_replica` for read-only requests; everything else
+    (no request, writes, flushes, INSERT/UPDATE/DELETE statements) uses the
+    normal bind, i.e. the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, "is_dml", False):
+            replica = g.get("db_replica") if has_app_context() else None
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -1,12 +1,18 @@
 const BASE_URL = "http://127.0.0.1:5000";
 
+// API calls send cookies: after a write the server sets db_primary_until so
+// that this browser's next reads see its own changes (see "Read Replicas").
+function apiFetch(url, options = {}) {
+  return fetch(url, { credentials: "include", ...options });
+}
+
 async function apiGet(endpoint) {
-  const res = await fetch(`${BASE_URL}${endpoint}`);
+  const res = await apiFetch(`${BASE_URL}${endpoint}`);
   return res.json();
 }
 
 async function apiPost(endpoint, data) {
-  const res = await fetch(`${BASE_URL}${endpoint}`, {
+  const res = await apiFetch(`${BASE_URL}${endpoint}`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(data),
@@ -15,7 +21,7 @@ async function apiPost(endpoint, data) {
 }
 
 async function apiPut(endpoint, data) {
-  const res = await fetch(`${BASE_URL}${endpoint}`, {
+  const res = await apiFetch(`${BASE_URL}${endpoint}`, {
     method: "PUT",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(data),
@@ -24,6 +30,6 @@ async function apiPut(endpoint, data) {
 }
 
 async function apiDelete(endpoint) {
-  const res = await fetch(`${BASE_URL}${endpoint}`, { method: "DELETE" });
+  const res = await apiFetch(`${BASE_URL}${endpoint}`, { method: "DELETE" });
   return res.json();
 }
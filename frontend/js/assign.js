@@ -17,11 +17,21 @@ function showMessage(message, type = "success") {
   setTimeout(() => msgBox.remove(), 2500);
 }
 
+// Whole org in one normalized response: departments, employees, projects
+// and the employee_project edge list as [employee_id, project_id] pairs.
+let snapshot = { employees: [], projects: [], employee_project: [] };
+
+async function loadSnapshot() {
+  const res = await apiFetch(`${BASE}/snapshot`);
+  snapshot = await res.json();
+  return snapshot;
+}
+
 // Open modal
 assignBtn.addEventListener("click", async () => {
-  // Load employees
-  const empRes = await fetch(`${BASE}/employees`);
-  const employees = await empRes.json();
+  // The snapshot is kept current by the change feed below.
+  const { employees, projects } = snapshot;
+
   employeeSelect.innerHTML = '<option value="">Select Employee</option>';
   employees.forEach(e => {
     const option = document.createElement("option");
@@ -30,9 +40,6 @@ assignBtn.addEventListener("click", async () => {
     employeeSelect.appendChild(option);
   });
 
-  // Load projects
-  const projRes = await fetch(`${BASE}/projects`);
-  const projects = await projRes.json();
   projectSelect.innerHTML = '<option value="">Select Project</option>';
   projects.forEach(p => {
     const option = document.createElement("option");
@@ -52,12 +59,20 @@ window.addEventListener("click", e => {
 
 // Load current assignments
 async function loadAssignments() {
-  const empRes = await fetch(`${BASE}/employees`);
-  const employees = await empRes.json();
+  await loadSnapshot();
+  renderAssignments();
+}
+
+function renderAssignments() {
+  const { employees, projects, employee_project } = snapshot;
+  const employeesById = new Map(employees.map(e => [e.id, e]));
+  const projectsById = new Map(projects.map(p => [p.id, p]));
   assignmentTableBody.innerHTML = "";
 
-  for (let e of employees) {
-    for (let p of e.projects) {
+  for (let [employeeId, projectId] of employee_project) {
+    const e = employeesById.get(employeeId);
+    const p = projectsById.get(projectId);
+    if (e && p) {
       const tr = document.createElement("tr");
       tr.innerHTML = `
         <td>${e.name}</td>
@@ -76,7 +91,7 @@ async function loadAssignments() {
       const empId = btn.dataset.employee;
       const projId = btn.dataset.project;
 
-      const res = await fetch(`${BASE}/projects/${projId}/unassign`, {
+      const res = await apiFetch(`${BASE}/projects/${projId}/unassign`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ employee_id: empId })
@@ -84,7 +99,7 @@ async function loadAssignments() {
 
       const result = await res.json();
       showMessage(result.message || result.error, result.error ? "error" : "success");
-      loadAssignments();
+      refreshIfOffline();
     });
   });
 }
@@ -100,7 +115,7 @@ assignForm.addEventListener("submit", async e => {
     return;
   }
 
-  const res = await fetch(`${BASE}/projects/${project_id}/assign`, {
+  const res = await apiFetch(`${BASE}/projects/${project_id}/assign`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ employee_id })
@@ -109,8 +124,69 @@ assignForm.addEventListener("submit", async e => {
   const result = await res.json();
   showMessage(result.message || result.error, result.error ? "error" : "success");
   assignModal.style.display = "none";
-  loadAssignments();
+  refreshIfOffline();
+});
+
+// -------------------------------
+// Change feed
+// -------------------------------
+// GET /events streams one record per committed write
+// ({entity, op, ids, version}); patch the local snapshot instead of
+// downloading everything again. EventSource resumes from the last event id
+// on reconnect; "reset" means events were missed, so reload.
+const changes = new EventSource(`${BASE}/events`, { withCredentials: true });
+const ENTITY_URLS = { employees: "employees", projects: "projects", departments: "departments" };
+
+changes.addEventListener("reset", () => loadAssignments());
+changes.addEventListener("change", async e => {
+  await applyChange(JSON.parse(e.data));
+  renderAssignments();
 });
 
+async function applyChange(change) {
+  if (change.entity === "employee_project") {
+    const ids = new Set(change.ids);
+    snapshot.employee_project = snapshot.employee_project.filter(
+      ([employeeId, projectId]) => !(projectId === change.project_id && ids.has(employeeId))
+    );
+    if (change.op === "assign") {
+      change.ids.forEach(id => snapshot.employee_project.push([id, change.project_id]));
+    }
+    return;
+  }
+
+  const rows = snapshot[change.entity];
+  if (!rows) return;
+  const ids = new Set(change.ids);
+
+  // Bulk updates carry the values they set; apply them without refetching.
+  if (change.op === "update" && change.changes) {
+    rows.forEach(row => { if (ids.has(row.id)) Object.assign(row, change.changes); });
+    return;
+  }
+  snapshot[change.entity] = rows.filter(row => !ids.has(row.id));
+
+  if (change.op === "delete") {
+    if (change.entity === "employees") {
+      snapshot.employee_project = snapshot.employee_project.filter(([employeeId]) => !ids.has(employeeId));
+    } else if (change.entity === "projects") {
+      snapshot.employee_project = snapshot.employee_project.filter(([, projectId]) => !ids.has(projectId));
+    }
+    return;
+  }
+
+  // Created or updated rows: fetch just those rows, without relations.
+  for (const id of change.ids) {
+    const res = await apiFetch(`${BASE}/${ENTITY_URLS[change.entity]}/${id}?include=`);
+    if (res.ok) snapshot[change.entity].push(await res.json());
+  }
+  snapshot[change.entity].sort((a, b) => a.id - b.id);
+}
+
+// Without a live feed, fall back to reloading after our own writes.
+function refreshIfOffline() {
+  if (changes.readyState !== EventSource.OPEN) loadAssignments();
+}
+
 // Initial load
 loadAssignments();
@@ -53,7 +53,7 @@ window.addEventListener("click", e => {
 // Load departments
 async function loadDepartments(query = "") {
   try {
-    const res = await fetch(`${BASE}/departments`);
+    const res = await apiFetch(`${BASE}/departments`);
     if (!res.ok) throw new Error("Failed to fetch departments");
     const data = await res.json();
 
@@ -98,7 +98,7 @@ function attachDeptEvents() {
   document.querySelectorAll(".edit").forEach(btn => {
     btn.addEventListener("click", async () => {
       const id = btn.dataset.id;
-      const res = await fetch(`${BASE}/departments/${id}`);
+      const res = await apiFetch(`${BASE}/departments/${id}`);
       const dept = await res.json();
 
       modalTitle.textContent = "Edit Department";
@@ -117,7 +117,7 @@ function attachDeptEvents() {
     btn.addEventListener("click", async () => {
       const id = btn.dataset.id;
       if (!confirm("Delete this department?")) return;
-      const res = await fetch(`${BASE}/departments/${id}`, { method: "DELETE" });
+      const res = await apiFetch(`${BASE}/departments/${id}`, { method: "DELETE" });
       const result = await res.json();
       showMessage(result.message || "Department deleted successfully", "success");
       loadDepartments();
@@ -142,7 +142,7 @@ deptForm.addEventListener("submit", async e => {
     method = "PUT";
   }
 
-  const res = await fetch(url, {
+  const res = await apiFetch(url, {
     method,
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(payload)
@@ -45,7 +45,7 @@ function showMessage(message, type = "success") {
 
 /* Load Departments */
 async function loadDepartments() {
-  const res = await fetch(`${BASE}/departments`);
+  const res = await apiFetch(`${BASE}/departments`);
   departments = await res.json();
 
   departmentSelect.innerHTML = `<option value="">-- Select Department --</option>`;
@@ -75,16 +75,10 @@ window.addEventListener("click", e => {
 
 /* Load Employees */
 async function loadEmployees(query = "") {
-  const res = await fetch(`${BASE}/employees`);
+  const search = query ? `?q=${encodeURIComponent(query)}` : "";
+  const res = await apiFetch(`${BASE}/employees${search}`);
   employees = await res.json();
 
-  if (query) {
-    employees = employees.filter(e =>
-      e.name.toLowerCase().includes(query.toLowerCase()) ||
-      e.email.toLowerCase().includes(query.toLowerCase())
-    );
-  }
-
   employeeTableBody.innerHTML = "";
   employees.forEach((e, index) => {
     const departmentName = departments.find(d => d.id === e.department_id)?.name || "-";
@@ -112,7 +106,7 @@ function attachEventListeners() {
   document.querySelectorAll(".edit").forEach(btn => {
     btn.addEventListener("click", async () => {
       const id = btn.dataset.id;
-      const res = await fetch(`${BASE}/employees/${id}`);
+      const res = await apiFetch(`${BASE}/employees/${id}`);
       const emp = await res.json();
 
       modalTitle.textContent = "Edit Employee";
@@ -134,7 +128,7 @@ function attachEventListeners() {
   document.querySelectorAll(".delete").forEach(btn => {
     btn.addEventListener("click", async () => {
       if (!confirm("Delete this employee?")) return;
-      const res = await fetch(`${BASE}/employees/${btn.dataset.id}`, { method: "DELETE" });
+      const res = await apiFetch(`${BASE}/employees/${btn.dataset.id}`, { method: "DELETE" });
       const data = await res.json();
       showMessage(data.message || "Employee deleted successfully", "success");
       loadEmployees();
@@ -179,7 +173,7 @@ employeeForm.addEventListener("submit", async e => {
     method = "PUT";
   }
 
-  const res = await fetch(url, {
+  const res = await apiFetch(url, {
     method,
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(payload)
@@ -44,7 +44,7 @@ window.addEventListener("click", e => {
 // Load Projects
 async function loadProjects(query = "") {
   try {
-    const res = await fetch(`${BASE}/projects`);
+    const res = await apiFetch(`${BASE}/projects`);
     if (!res.ok) throw new Error("Failed to fetch projects");
     const data = await res.json();
 
@@ -83,7 +83,7 @@ function attachProjectEvents() {
   document.querySelectorAll(".edit").forEach(btn => {
     btn.addEventListener("click", async () => {
       const id = btn.dataset.id;
-      const res = await fetch(`${BASE}/projects/${id}`);
+      const res = await apiFetch(`${BASE}/projects/${id}`);
       const proj = await res.json();
 
       modalTitle.textContent = "Edit Project";
@@ -103,7 +103,7 @@ function attachProjectEvents() {
   document.querySelectorAll(".delete").forEach(btn => {
     btn.addEventListener("click", async () => {
       if (!confirm("Delete this project?")) return;
-      const res = await fetch(`${BASE}/projects/${btn.dataset.id}`, { method: "DELETE" });
+      const res = await apiFetch(`${BASE}/projects/${btn.dataset.id}`, { method: "DELETE" });
       const result = await res.json();
       showMessage(result.message || "Project deleted successfully", "success");
       loadProjects();
@@ -139,7 +139,7 @@ projectForm.addEventListener("submit", async e => {
     method = "PUT";
   }
 
-  const res = await fetch(url, {
+  const res = await apiFetch(url, {
     method,
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify(payload)
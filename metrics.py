@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import defaultdict
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from extensions import db
+from engines import pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# -------------------------------
+# Metrics Registry
+# -------------------------------
+class EndpointStats:
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.latency_sum = 0.0
+        self.statuses = defaultdict(int)
+        self.statements = 0
+        self.db_time = 0.0
+
+
+class MetricsRegistry:
+    """Per-endpoint request latency histograms and SQL usage.
+
+    Recording is a couple of integer updates under a lock; the Prometheus
+    text is only rendered when /metrics is scraped.
+    """
+
+    def __init__(self):
+        self._endpoints = defaultdict(EndpointStats)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, method, status, latency, statements, db_time):
+        with self._lock:
+            stats = self._endpoints[(endpoint, method)]
+            stats.count += 1
+            stats.latency_sum += latency
+            stats.statuses[status] += 1
+            stats.statements += statements
+            stats.db_time += db_time
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats.bucket_counts[i] += 1
+                    break
+
+    def render(self, caches=None, replicas=None, pools=None):
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by endpoint.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            snapshot = sorted(self._endpoints.items())
+            for (endpoint, method), stats in snapshot:
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.latency_sum}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+            lines += [
+                "# HELP http_requests_total Requests by endpoint and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (endpoint, method), stats in snapshot:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}'
+                    )
+
+            lines += [
+                "# HELP db_statements_total SQL statements executed by endpoint.",
+                "# TYPE db_statements_total counter",
+            ]
+            for (endpoint, method), stats in snapshot:
+                lines.append(f'db_statements_total{{endpoint="{endpoint}",method="{method}"}} {stats.statements}')
+
+            lines += [
+                "# HELP db_time_seconds_total Time spent executing SQL by endpoint.",
+                "# TYPE db_time_seconds_total counter",
+            ]
+            for (endpoint, method), stats in snapshot:
+                lines.append(f'db_time_seconds_total{{endpoint="{endpoint}",method="{method}"}} {stats.db_time}')
+
+        if caches:
+            lines += [
+                "# HELP lookup_cache_requests_total Lookup cache hits and misses.",
+                "# TYPE lookup_cache_requests_total counter",
+            ]
+            for name, cache in sorted(caches.items()):
+                stats = cache.stats()
+                lines.append(f'lookup_cache_requests_total{{cache="{name}",result="hit"}} {stats["hits"]}')
+                lines.append(f'lookup_cache_requests_total{{cache="{name}",result="miss"}} {stats["misses"]}')
+
+        if replicas and replicas.names:
+            stats = replicas.stats()
+            lines += [
+                "# HELP db_reads_total Read-only requests by the database that served them.",
+                "# TYPE db_reads_total counter",
+            ]
+            for target, count in sorted(stats["reads"].items()):
+                lines.append(f'db_reads_total{{target="{target}"}} {count}')
+            lines += [
+                "# HELP db_replica_up Whether a replica is currently used for reads.",
+                "# TYPE db_replica_up gauge",
+            ]
+            for name, replica in sorted(stats["replicas"].items()):
+                lines.append(f'db_replica_up{{replica="{name}"}} {int(replica["healthy"])}')
+            lines += [
+                "# HELP db_replica_failures_total Times a replica was marked down.",
+                "# TYPE db_replica_failures_total counter",
+            ]
+            for name, replica in sorted(stats["replicas"].items()):
+                lines.append(f'db_replica_failures_total{{replica="{name}"}} {replica["failures"]}')
+
+        if pools:
+            lines += render_pools(pools)
+
+        return "\n".join(lines) + "\n"
+
+
+def render_pools(pools):
+    """Prometheus lines for {engine name: engines.pool_stats(...)}."""
+    pooled = sorted((name, stats) for name, stats in pools.items() if "size" in stats)
+    lines = []
+    for metric, key, kind, help_text in (
+        ("db_pool_size", "size", "gauge", "Configured connections kept open by the pool."),
+        ("db_pool_checked_out", "checked_out", "gauge", "Connections currently in use."),
+        ("db_pool_overflow", "overflow", "gauge", "Connections open beyond the pool size."),
+    ):
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        for name, stats in pooled:
+            lines.append(f'{metric}{{engine="{name}"}} {stats[key]}')
+
+    timed = [(name, stats["acquire"]) for name, stats in pooled if "acquire" in stats]
+    if timed:
+        lines += [
+            "# HELP db_pool_acquire_seconds Time spent waiting for a pooled connection.",
+            "# TYPE db_pool_acquire_seconds histogram",
+        ]
+        for name, acquire in timed:
+            cumulative = 0
+            for bound, count in acquire["buckets"]:
+                cumulative += count
+                lines.append(f'db_pool_acquire_seconds_bucket{{engine="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'db_pool_acquire_seconds_bucket{{engine="{name}",le="+Inf"}} {acquire["count"]}')
+            lines.append(f'db_pool_acquire_seconds_sum{{engine="{name}"}} {acquire["total"]}')
+            lines.append(f'db_pool_acquire_seconds_count{{engine="{name}"}} {acquire["count"]}')
+        lines += [
+            "# HELP db_pool_acquire_seconds_max Longest wait for a pooled connection.",
+            "# TYPE db_pool_acquire_seconds_max gauge",
+        ]
+        for name, acquire in timed:
+            lines.append(f'db_pool_acquire_seconds_max{{engine="{name}"}} {acquire["max"]}')
+        lines += [
+            "# HELP db_pool_timeouts_total Checkouts that gave up after DB_POOL_TIMEOUT.",
+            "# TYPE db_pool_timeouts_total counter",
+        ]
+        for name, acquire in timed:
+            lines.append(f'db_pool_timeouts_total{{engine="{name}"}} {acquire["timeouts"]}')
+    return lines
+
+
+# -------------------------------
+# Flask / SQLAlchemy Hooks
+# -------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and conn.info.get("query_start"):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        g.sql_statements = g.get("sql_statements", 0) + 1
+        g.sql_time = g.get("sql_time", 0.0) + elapsed
+
+
+def _handle_error(context):
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+
+def init_metrics(app):
+    registry = MetricsRegistry()
+    app.extensions["metrics"] = registry
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_error)
+
+    @app.before_request
+    def start_timer():
+        g.sql_statements = 0
+        g.sql_time = 0.0
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "<unmatched>"
+            registry.record(
+                endpoint,
+                request.method,
+                response.status_code,
+                time.perf_counter() - start,
+                g.get("sql_statements", 0),
+                g.get("sql_time", 0.0)
+            )
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        pools = {name or "primary": pool_stats(engine) for name, engine in db.engines.items()}
+        async_engine = app.extensions.get("async_engine")
+        if async_engine is not None:
+            pools["primary_async"] = pool_stats(async_engine.sync_engine)
+        body = registry.render(app.extensions.get("lookup_caches"), app.extensions.get("replica_router"), pools)
+        return Response(body, mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,32 @@
+"""Add table_versions for ETag support
+
+Revision ID: 8e1f4d6b2c70
+Revises: 5b7e2c41a9d3
+Create Date: 2026-10-17 10:02:11.930514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e1f4d6b2c70'
+down_revision = '5b7e2c41a9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_versions = op.create_table('table_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table_versions, [
+        {'name': name, 'version': 0}
+        for name in ('departments', 'employees', 'projects', 'employee_project')
+    ])
+
+
+def downgrade():
+    op.drop_table('table_versions')
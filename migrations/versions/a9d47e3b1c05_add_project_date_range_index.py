@@ -0,0 +1,26 @@
+"""Index project date ranges for overlap queries
+
+Revision ID: a9d47e3b1c05
+Revises: f6c2a8d41e93
+Create Date: 2026-10-17 17:24:11.905263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d47e3b1c05'
+down_revision = 'f6c2a8d41e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_end_date_start_date', ['end_date', 'start_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_end_date_start_date')
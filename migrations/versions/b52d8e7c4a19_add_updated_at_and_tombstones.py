@@ -0,0 +1,59 @@
+"""Add updated_at change tracking and tombstones for delta sync
+
+Revision ID: b52d8e7c4a19
+Revises: e7a3b95d1f28
+Create Date: 2026-10-17 14:21:07.562318
+
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d8e7c4a19'
+down_revision = 'e7a3b95d1f28'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ('departments', 'employees', 'projects')
+
+
+def timestamp():
+    return sa.DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+def upgrade():
+    # Existing rows count as changed now; the column is filled in before it
+    # becomes NOT NULL. The app stores naive UTC (models.utcnow), while
+    # CURRENT_TIMESTAMP is session-local time on MySQL, so bind the value.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table in TRACKED_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', timestamp(), nullable=True))
+        op.execute(sa.table(table, sa.column('updated_at')).update().values(updated_at=now))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=timestamp(), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_updated_at'), ['updated_at'], unique=False)
+
+    op.create_table('tombstones',
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', timestamp(), nullable=False),
+    sa.PrimaryKeyConstraint('entity', 'entity_id')
+    )
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.create_index('ix_tombstones_entity_deleted_at', ['entity', 'deleted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tombstones', schema=None) as batch_op:
+        batch_op.drop_index('ix_tombstones_entity_deleted_at')
+
+    op.drop_table('tombstones')
+
+    for table in reversed(TRACKED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_updated_at'))
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,32 @@
+"""Add code_sequences for dept_code / project_code allocation
+
+Revision ID: c41d9a7e05b2
+Revises: 8e1f4d6b2c70
+Create Date: 2026-10-17 11:20:47.602113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d9a7e05b2'
+down_revision = '8e1f4d6b2c70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    code_sequences = op.create_table('code_sequences',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('next_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(code_sequences, [
+        {'name': 'dept_code', 'next_value': 0},
+        {'name': 'project_code', 'next_value': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('code_sequences')
@@ -0,0 +1,63 @@
+"""Add department_stats and department_project_coverage rollups
+
+Revision ID: e7a3b95d1f28
+Revises: c41d9a7e05b2
+Create Date: 2026-10-17 13:05:52.174390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b95d1f28'
+down_revision = 'c41d9a7e05b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('department_stats',
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('headcount', sa.Integer(), nullable=False),
+    sa.Column('total_salary', sa.Float(), nullable=False),
+    sa.Column('salary_count', sa.Integer(), nullable=False),
+    sa.Column('project_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('department_id')
+    )
+    op.create_table('department_project_coverage',
+    sa.Column('department_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('member_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('department_id', 'project_id')
+    )
+
+    # Backfill from the existing rows; `flask rebuild-department-stats`
+    # recomputes the same numbers on demand.
+    op.execute("""
+        INSERT INTO department_stats (department_id, headcount, total_salary, salary_count, project_count)
+        SELECT department_id, COUNT(id), COALESCE(SUM(salary), 0), COUNT(salary), 0
+        FROM employees
+        WHERE department_id IS NOT NULL
+        GROUP BY department_id
+    """)
+    op.execute("""
+        INSERT INTO department_project_coverage (department_id, project_id, member_count)
+        SELECT e.department_id, ep.project_id, COUNT(*)
+        FROM employees e
+        JOIN employee_project ep ON ep.employee_id = e.id
+        WHERE e.department_id IS NOT NULL
+        GROUP BY e.department_id, ep.project_id
+    """)
+    op.execute("""
+        UPDATE department_stats
+        SET project_count = (
+            SELECT COUNT(*) FROM department_project_coverage c
+            WHERE c.department_id = department_stats.department_id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_table('department_project_coverage')
+    op.drop_table('department_stats')
@@ -0,0 +1,41 @@
+"""Index employee_project and department_project_coverage by project
+
+Revision ID: f6c2a8d41e93
+Revises: b52d8e7c4a19
+Create Date: 2026-10-17 16:02:44.318907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c2a8d41e93'
+down_revision = 'b52d8e7c4a19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Both primary keys lead with the other column, so lookups by project
+    # scanned the whole table. (project_id, employee_id) also covers the
+    # member-id subqueries and replaces the FK index MySQL created on its own.
+    with op.batch_alter_table('employee_project', schema=None) as batch_op:
+        batch_op.create_index('ix_employee_project_project_id_employee_id', ['project_id', 'employee_id'], unique=False)
+
+    with op.batch_alter_table('department_project_coverage', schema=None) as batch_op:
+        batch_op.create_index('ix_department_project_coverage_project_id', ['project_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('department_project_coverage', schema=None) as batch_op:
+        batch_op.drop_index('ix_department_project_coverage_project_id')
+
+    # MySQL dropped its own project_id FK index when the composite one was
+    # created and refuses to drop the last index the FK can use (error
+    # 1553), so put a plain one back first.
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('project_id', 'employee_project', ['project_id'], unique=False)
+
+    with op.batch_alter_table('employee_project', schema=None) as batch_op:
+        batch_op.drop_index('ix_employee_project_project_id_employee_id')
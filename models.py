@@ -1,7 +1,17 @@
 from extensions import db
-from datetime import datetime, date
+from datetime import datetime, date, timezone
+from sqlalchemy.dialects import mysql
 import re
-import random, string
+from codes import allocate_code
+
+# Change-tracking timestamps are naive UTC with microseconds (MySQL's
+# DATETIME defaults to whole seconds).
+Timestamp = db.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 # -------------------------------
 # Department Model
@@ -16,8 +26,9 @@ class Department(db.Model):
         db.String(4),
         unique=True,
         nullable=False,
-        default=lambda: ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+        default=lambda: allocate_code('dept_code')
     )
+    updated_at = db.Column(Timestamp, nullable=False, default=utcnow, onupdate=utcnow, index=True)
 
     employees = db.relationship('Employee', backref='department', lazy=True)
 
@@ -35,11 +46,12 @@ class Employee(db.Model):
     __tablename__ = 'employees'
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    salary = db.Column(db.Float)
-    join_date = db.Column(db.Date, nullable=False, default=date.today)
-    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'))
+    salary = db.Column(db.Float, index=True)
+    join_date = db.Column(db.Date, nullable=False, default=date.today, index=True)
+    department_id = db.Column(db.Integer, db.ForeignKey('departments.id'), index=True)
+    updated_at = db.Column(Timestamp, nullable=False, default=utcnow, onupdate=utcnow, index=True)
 
     @staticmethod
     def is_valid_name(name):
@@ -68,7 +80,10 @@ class Employee(db.Model):
 employee_project = db.Table(
     'employee_project',
     db.Column('employee_id', db.Integer, db.ForeignKey('employees.id'), primary_key=True),
-    db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
+    # The primary key only serves lookups by employee; this one serves
+    # "members of a project" without touching the base table.
+    db.Index('ix_employee_project_project_id_employee_id', 'project_id', 'employee_id')
 )
 
 # -------------------------------
@@ -76,6 +91,8 @@ employee_project = db.Table(
 # -------------------------------
 class Project(db.Model):
     __tablename__ = 'projects'
+    # Date-window overlap queries: end_date >= :from (or NULL) AND start_date <= :to.
+    __table_args__ = (db.Index('ix_projects_end_date_start_date', 'end_date', 'start_date'),)
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
@@ -86,8 +103,9 @@ class Project(db.Model):
         db.String(5),
         unique=True,
         nullable=False,
-        default=lambda: ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
+        default=lambda: allocate_code('project_code')
     )
+    updated_at = db.Column(Timestamp, nullable=False, default=utcnow, onupdate=utcnow, index=True)
 
     employees = db.relationship('Employee', secondary=employee_project, backref='projects', lazy='dynamic')
 
@@ -104,3 +122,72 @@ class Project(db.Model):
 
     def __repr__(self):
         return f"<Project {self.title} ({self.project_code})>"
+
+# -------------------------------
+# Table Version Model
+# -------------------------------
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TableVersion {self.name}={self.version}>"
+
+# -------------------------------
+# Code Sequence Model
+# -------------------------------
+class CodeSequence(db.Model):
+    __tablename__ = 'code_sequences'
+
+    name = db.Column(db.String(32), primary_key=True)
+    next_value = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CodeSequence {self.name}={self.next_value}>"
+
+# -------------------------------
+# Department Rollup Models
+# -------------------------------
+# Derived data maintained by rollups.py; no foreign keys so rollup rows can
+# be adjusted in any order relative to the base-table writes.
+class DepartmentStats(db.Model):
+    __tablename__ = 'department_stats'
+
+    department_id = db.Column(db.Integer, primary_key=True)
+    headcount = db.Column(db.Integer, nullable=False, default=0)
+    total_salary = db.Column(db.Float, nullable=False, default=0)
+    salary_count = db.Column(db.Integer, nullable=False, default=0)
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DepartmentStats {self.department_id} headcount={self.headcount}>"
+
+
+class DepartmentProjectCoverage(db.Model):
+    __tablename__ = 'department_project_coverage'
+    __table_args__ = (db.Index('ix_department_project_coverage_project_id', 'project_id'),)
+
+    department_id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, primary_key=True)
+    member_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DepartmentProjectCoverage {self.department_id}/{self.project_id}={self.member_count}>"
+
+# -------------------------------
+# Tombstone Model
+# -------------------------------
+# One row per deleted department/employee/project, so delta syncs
+# (?updated_since=) can report deletions.
+class Tombstone(db.Model):
+    __tablename__ = 'tombstones'
+    __table_args__ = (db.Index('ix_tombstones_entity_deleted_at', 'entity', 'deleted_at'),)
+
+    entity = db.Column(db.String(32), primary_key=True)
+    entity_id = db.Column(db.Integer, primary_key=True)
+    deleted_at = db.Column(Timestamp, nullable=False, default=utcnow)
+
+    def __repr__(self):
+        return f"<Tombstone {self.entity}/{self.entity_id}>"
@@ -0,0 +1,82 @@
+import base64
+import json
+from datetime import date
+from sqlalchemy import Date, and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+# -------------------------------
+# Cursor Encoding
+# -------------------------------
+def encode_cursor(sort, last_row):
+    value = getattr(last_row, sort)
+    if isinstance(value, date):
+        value = value.isoformat()
+    payload = json.dumps({"s": sort, "v": value, "id": last_row.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort, model):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise ValueError
+        value = payload["v"]
+        if isinstance(getattr(model, sort).type, Date):
+            value = date.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+# -------------------------------
+# Keyset Pagination
+# -------------------------------
+def get_page_args(args, sortable):
+    """Return (limit, sort, after) for a paginated request, or None when the
+    client did not ask for pagination (old clients get the full list)."""
+    if "limit" not in args and "after" not in args:
+        return None
+
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    sort = args.get("sort", "id")
+    if sort not in sortable:
+        raise ValueError(f"sort must be one of: {', '.join(sortable)}")
+
+    return limit, sort, args.get("after")
+
+
+def keyset_page(query, model, limit, sort, after=None):
+    """Fetch one page ordered by (sort, id) starting strictly after the cursor.
+
+    Seeks on the sort key instead of using OFFSET, so the cost of a page
+    does not grow with how deep into the table it is.
+    """
+    sort_col = getattr(model, sort)
+    if after:
+        value, last_id = decode_cursor(after, sort, model)
+        if sort == "id":
+            query = query.filter(model.id > last_id)
+        else:
+            query = query.filter(or_(
+                sort_col > value,
+                and_(sort_col == value, model.id > last_id)
+            ))
+
+    order = [model.id] if sort == "id" else [sort_col, model.id]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1])
+    return rows, next_cursor
@@ -0,0 +1,147 @@
+import itertools
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from flask import g, request
+from sqlalchemy.exc import DBAPIError, OperationalError
+from extensions import db
+
+READ_METHODS = {"GET", "HEAD"}
+PRIMARY_COOKIE = "db_primary_until"
+
+
+# -------------------------------
+# Replica Router
+# -------------------------------
+class ReplicaRouter:
+    """Round-robin choice among the replica binds that are not marked down.
+
+    A replica that fails is skipped for `retry_seconds`, then tried again
+    by the next read that lands on it.
+    """
+
+    def __init__(self, names, retry_seconds, clock=time.monotonic):
+        self.names = list(names)
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._cycle = itertools.cycle(self.names)
+        self._down_until = {}
+        self._reads = defaultdict(int)
+        self._failures = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        with self._lock:
+            now = self._clock()
+            for _ in range(len(self.names)):
+                name = next(self._cycle)
+                if self._down_until.get(name, 0) <= now:
+                    return name
+        return None
+
+    def mark_down(self, name):
+        with self._lock:
+            self._down_until[name] = self._clock() + self.retry_seconds
+            self._failures[name] += 1
+
+    def record_read(self, target):
+        with self._lock:
+            self._reads[target] += 1
+
+    def stats(self):
+        with self._lock:
+            now = self._clock()
+            return {
+                "replicas": {
+                    name: {
+                        "healthy": self._down_until.get(name, 0) <= now,
+                        "failures": self._failures[name],
+                    }
+                    for name in self.names
+                },
+                "reads": dict(self._reads),
+            }
+
+
+def _replica_failed(error):
+    return isinstance(error, OperationalError) or getattr(error, "connection_invalidated", False)
+
+
+def with_replica_fallback(router, view):
+    """Re-run a read on the primary when its replica cannot be reached."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except DBAPIError as e:
+            name = g.get("db_replica_name")
+            if name is None or not _replica_failed(e):
+                raise
+            router.mark_down(name)
+            db.session.rollback()
+            g.db_replica = g.db_replica_name = None
+            return view(*args, **kwargs)
+    return wrapper
+
+
+# -------------------------------
+# Flask Hooks
+# -------------------------------
+def replica_names(config):
+    return [f"replica_{index}" for index in range(len(config['REPLICA_DATABASE_URIS']))]
+
+
+def configure_replica_binds(app):
+    """Register REPLICA_DATABASE_URIS as binds replica_0, replica_1, ...
+
+    Must run before db.init_app so Flask-SQLAlchemy creates their engines.
+    """
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    binds.update(zip(replica_names(app.config), app.config['REPLICA_DATABASE_URIS']))
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def init_replicas(app):
+    """Route read-only requests to replicas; call after the routes exist.
+
+    GET/HEAD requests read from a healthy replica. Other requests, and
+    reads from a client that wrote within the last READ_YOUR_WRITES_SECONDS
+    (tracked with a cookie, so it holds across worker processes), use the
+    primary.
+    """
+    names = replica_names(app.config)
+    router = ReplicaRouter(names, app.config['REPLICA_RETRY_SECONDS'])
+    app.extensions["replica_router"] = router
+    if not names:
+        return router
+
+    def recently_wrote():
+        try:
+            return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    @app.before_request
+    def choose_replica():
+        g.db_replica = g.db_replica_name = None
+        if request.method in READ_METHODS and not recently_wrote():
+            name = router.choose()
+            if name is not None:
+                g.db_replica = db.engines[name]
+                g.db_replica_name = name
+
+    @app.after_request
+    def track_writes(response):
+        if request.method in READ_METHODS:
+            router.record_read(g.get("db_replica_name") or "primary")
+        elif request.method != "OPTIONS" and response.status_code < 400:
+            seconds = app.config['READ_YOUR_WRITES_SECONDS']
+            response.set_cookie(PRIMARY_COOKIE, str(time.time() + seconds), max_age=seconds,
+                                httponly=True, samesite="Lax")
+        return response
+
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint != "static" and rule.methods - {"HEAD", "OPTIONS"} <= READ_METHODS:
+            app.view_functions[rule.endpoint] = with_replica_fallback(router, app.view_functions[rule.endpoint])
+    return router
@@ -0,0 +1,343 @@
+from collections import Counter, defaultdict
+import click
+from extensions import db
+from models import Employee, Department, DepartmentStats, DepartmentProjectCoverage, employee_project
+
+stats_table = DepartmentStats.__table__
+coverage_table = DepartmentProjectCoverage.__table__
+
+
+# -------------------------------
+# Helper Functions
+# -------------------------------
+def _department_key(value):
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _salary(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _add(table, key, deltas):
+    """UPDATE ... SET col = col + delta, inserting the row if it is missing.
+
+    The increment happens in SQL, so concurrent writers never lose updates.
+    """
+    stmt = table.update().values({col: table.c[col] + delta for col, delta in deltas.items()})
+    for col, value in key.items():
+        stmt = stmt.where(table.c[col] == value)
+    if not db.session.execute(stmt).rowcount:
+        db.session.execute(table.insert().values(**key, **deltas))
+
+
+def _add_many(table, key_columns, rows):
+    """_add for many keys at once; `rows` is a list of (key, deltas) dicts.
+
+    One SELECT finds the keys that already have a row, then all of them are
+    incremented with a single executemany UPDATE and the rest inserted with
+    a single executemany INSERT.
+    """
+    rows = [(key, deltas) for key, deltas in rows if any(deltas.values())]
+    if not rows:
+        return
+    key_cols = [table.c[col] for col in key_columns]
+    keys = [tuple(key[col] for col in key_columns) for key, _ in rows]
+    # One IN per key column (a superset of the wanted keys) rather than a
+    # row-value IN, which SQLite cannot answer from the primary key.
+    existing = set(keys).intersection(tuple(row) for row in db.session.execute(
+        db.select(*key_cols).where(*(col.in_({k[i] for k in keys}) for i, col in enumerate(key_cols)))
+    ))
+
+    delta_columns = list(rows[0][1])
+    updates = [
+        {**{f"k_{col}": key[col] for col in key_columns}, **{f"d_{col}": deltas[col] for col in delta_columns}}
+        for (key, deltas), k in zip(rows, keys) if k in existing
+    ]
+    inserts = [{**key, **deltas} for (key, deltas), k in zip(rows, keys) if k not in existing]
+    if updates:
+        stmt = table.update().values({col: table.c[col] + db.bindparam(f"d_{col}") for col in delta_columns})
+        for col in key_columns:
+            stmt = stmt.where(table.c[col] == db.bindparam(f"k_{col}"))
+        db.session.execute(stmt, updates)
+    if inserts:
+        db.session.execute(table.insert(), inserts)
+
+
+# -------------------------------
+# Incremental Maintenance
+# -------------------------------
+# Each function applies the delta of one write inside the caller's
+# transaction, so the rollup commits or rolls back with the write itself.
+def record_employees(rows, sign=1):
+    """Add (sign=1) or remove (sign=-1) employees given as (department_id, salary)."""
+    per_department = defaultdict(lambda: [0, 0.0, 0])
+    for department_id, salary in rows:
+        department_id = _department_key(department_id)
+        if department_id is None:
+            continue
+        totals = per_department[department_id]
+        totals[0] += sign
+        salary = _salary(salary)
+        if salary is not None:
+            totals[1] += sign * salary
+            totals[2] += sign
+
+    for department_id, (headcount, total_salary, salary_count) in per_department.items():
+        _add(stats_table, {"department_id": department_id}, {
+            "headcount": headcount,
+            "total_salary": total_salary,
+            "salary_count": salary_count,
+        })
+
+
+def record_assignments(pairs, sign=1):
+    """Add or remove project memberships given as (department_id, project_id)."""
+    counts = Counter(
+        (_department_key(department_id), project_id)
+        for department_id, project_id in pairs
+        if _department_key(department_id) is not None
+    )
+    _record_coverage(counts, sign)
+
+
+def _record_coverage(counts, sign):
+    _add_many(coverage_table, ("department_id", "project_id"), [
+        ({"department_id": department_id, "project_id": project_id}, {"member_count": sign * count})
+        for (department_id, project_id), count in counts.items()
+    ])
+
+    refresh_project_counts({department_id for department_id, _ in counts})
+
+
+def record_employee_move(employee_id, old_department_id, new_department_id):
+    """Move an employee's project memberships to a new department."""
+    if _department_key(old_department_id) == _department_key(new_department_id):
+        return
+    project_ids = [row.project_id for row in db.session.execute(
+        db.select(employee_project.c.project_id).where(employee_project.c.employee_id == employee_id)
+    )]
+    record_assignments([(old_department_id, p) for p in project_ids], sign=-1)
+    record_assignments([(new_department_id, p) for p in project_ids])
+
+
+# Set-based writes (bulk PATCH/DELETE) adjust the rollups from grouped
+# queries over the affected rows: one row per department (and project)
+# instead of one per employee.
+def record_employee_set(condition, sign=1, memberships=True):
+    """Add or remove every employee matching `condition`.
+
+    For an UPDATE of salary or department, call with sign=-1 before and
+    sign=1 after the statement, with a condition that still matches the
+    same rows (e.g. on ids). `memberships` also moves their project
+    coverage, which only depends on the department.
+    """
+    totals = db.session.execute(
+        db.select(Employee.department_id, db.func.count(Employee.id),
+                  db.func.sum(Employee.salary), db.func.count(Employee.salary))
+        .where(condition, Employee.department_id.isnot(None))
+        .group_by(Employee.department_id)
+    )
+    _add_many(stats_table, ("department_id",), [
+        ({"department_id": department_id}, {
+            "headcount": sign * headcount,
+            "total_salary": sign * float(total_salary or 0),
+            "salary_count": sign * salary_count,
+        })
+        for department_id, headcount, total_salary, salary_count in totals
+    ])
+
+    if memberships:
+        counts = {
+            (department_id, project_id): count
+            for department_id, project_id, count in db.session.execute(
+                db.select(Employee.department_id, employee_project.c.project_id, db.func.count())
+                .join(employee_project, employee_project.c.employee_id == Employee.id)
+                .where(condition, Employee.department_id.isnot(None))
+                .group_by(Employee.department_id, employee_project.c.project_id)
+            )
+        }
+        _record_coverage(counts, sign)
+
+
+def record_membership_set(project_id, condition, sign=1):
+    """Add or remove memberships of `project_id` for the employees matching `condition`."""
+    counts = {
+        (department_id, project_id): count
+        for department_id, count in db.session.execute(
+            db.select(Employee.department_id, db.func.count())
+            .where(condition, Employee.department_id.isnot(None))
+            .group_by(Employee.department_id)
+        )
+    }
+    _record_coverage(counts, sign)
+
+
+def merge_department(old_department_id, new_department_id):
+    """Move all of one department's totals to another, for a transfer of
+    every employee; reads only the rollup rows of the old department."""
+    if old_department_id == new_department_id:
+        return
+    stats = db.session.execute(
+        db.select(stats_table).where(stats_table.c.department_id == old_department_id)
+    ).first()
+    if stats:
+        _add(stats_table, {"department_id": new_department_id}, {
+            "headcount": stats.headcount,
+            "total_salary": stats.total_salary,
+            "salary_count": stats.salary_count,
+        })
+        db.session.execute(
+            stats_table.update().where(stats_table.c.department_id == old_department_id)
+            .values(headcount=0, total_salary=0, salary_count=0)
+        )
+
+    _add_many(coverage_table, ("department_id", "project_id"), [
+        ({"department_id": new_department_id, "project_id": row.project_id}, {"member_count": row.member_count})
+        for row in db.session.execute(
+            db.select(coverage_table.c.project_id, coverage_table.c.member_count)
+            .where(coverage_table.c.department_id == old_department_id)
+        ).all()
+    ])
+    db.session.execute(coverage_table.delete().where(coverage_table.c.department_id == old_department_id))
+    refresh_project_counts({old_department_id, new_department_id})
+
+
+def remove_department(department_id):
+    db.session.execute(stats_table.delete().where(stats_table.c.department_id == department_id))
+    db.session.execute(coverage_table.delete().where(coverage_table.c.department_id == department_id))
+
+
+def remove_project(project_id):
+    department_ids = {row.department_id for row in db.session.execute(
+        db.select(coverage_table.c.department_id).where(coverage_table.c.project_id == project_id)
+    )}
+    db.session.execute(coverage_table.delete().where(coverage_table.c.project_id == project_id))
+    refresh_project_counts(department_ids)
+
+
+def refresh_project_counts(department_ids):
+    """Recount covered projects for the given departments from the coverage rows."""
+    if not department_ids:
+        return
+    db.session.execute(coverage_table.delete().where(
+        coverage_table.c.department_id.in_(department_ids) & (coverage_table.c.member_count <= 0)
+    ))
+    covered = (
+        db.select(db.func.count())
+        .where(coverage_table.c.department_id == stats_table.c.department_id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        stats_table.update()
+        .where(stats_table.c.department_id.in_(department_ids))
+        .values(project_count=covered)
+    )
+
+
+# -------------------------------
+# Reads
+# -------------------------------
+def department_stats_to_dict(department_id, name, stats):
+    headcount = stats.headcount if stats else 0
+    total_salary = stats.total_salary if stats else 0.0
+    salary_count = stats.salary_count if stats else 0
+    return {
+        "department_id": department_id,
+        "name": name,
+        "headcount": headcount,
+        "total_salary": total_salary,
+        "average_salary": round(total_salary / salary_count, 2) if salary_count else None,
+        "project_count": stats.project_count if stats else 0
+    }
+
+
+def get_department_stats(department_id=None):
+    query = db.session.query(Department.id, Department.name, DepartmentStats).outerjoin(
+        DepartmentStats, DepartmentStats.department_id == Department.id
+    )
+    if department_id is not None:
+        query = query.filter(Department.id == department_id)
+    return [department_stats_to_dict(d_id, name, stats) for d_id, name, stats in query.order_by(Department.id)]
+
+
+# -------------------------------
+# Full Rebuild
+# -------------------------------
+def compute_rollups():
+    """Compute the rollup rows from the base tables with two GROUP BY queries."""
+    stats = {
+        department_id: {"department_id": department_id, "headcount": headcount,
+                        "total_salary": float(total_salary or 0), "salary_count": salary_count,
+                        "project_count": 0}
+        for department_id, headcount, total_salary, salary_count in db.session.execute(
+            db.select(Employee.department_id, db.func.count(Employee.id),
+                      db.func.sum(Employee.salary), db.func.count(Employee.salary))
+            .where(Employee.department_id.isnot(None))
+            .group_by(Employee.department_id)
+        )
+    }
+    coverage = [
+        {"department_id": department_id, "project_id": project_id, "member_count": count}
+        for department_id, project_id, count in db.session.execute(
+            db.select(Employee.department_id, employee_project.c.project_id, db.func.count())
+            .join(employee_project, employee_project.c.employee_id == Employee.id)
+            .where(Employee.department_id.isnot(None))
+            .group_by(Employee.department_id, employee_project.c.project_id)
+        )
+    ]
+    for row in coverage:
+        stats[row["department_id"]]["project_count"] += 1
+    return list(stats.values()), coverage
+
+
+def check_rollups():
+    """Return a list of departments whose stored rollup differs from a recount."""
+    expected, _ = compute_rollups()
+    expected = {row["department_id"]: row for row in expected}
+    stored = {row.department_id: row._asdict() for row in db.session.execute(db.select(stats_table))}
+
+    mismatches = []
+    for department_id in sorted(set(expected) | set(stored)):
+        want = expected.get(department_id)
+        have = stored.get(department_id)
+        if want is None and have and not have["headcount"]:
+            continue
+        if (want is None or have is None
+                or any(abs((have[k] or 0) - want[k]) > 1e-6 for k in want if k != "department_id")):
+            mismatches.append({"department_id": department_id, "stored": have, "expected": want})
+    return mismatches
+
+
+def rebuild_rollups():
+    stats, coverage = compute_rollups()
+    db.session.execute(coverage_table.delete())
+    db.session.execute(stats_table.delete())
+    if stats:
+        db.session.execute(stats_table.insert(), stats)
+    if coverage:
+        db.session.execute(coverage_table.insert(), coverage)
+    db.session.commit()
+    return len(stats)
+
+
+def init_rollup_commands(app):
+    @app.cli.command("rebuild-department-stats")
+    @click.option("--check", is_flag=True, help="Only report departments whose rollup is out of date.")
+    def rebuild_department_stats(check):
+        """Recompute department_stats from employees and employee_project."""
+        mismatches = check_rollups()
+        for mismatch in mismatches:
+            click.echo(f"department {mismatch['department_id']}: stored={mismatch['stored']} "
+                       f"expected={mismatch['expected']}")
+        if check:
+            click.echo(f"{len(mismatches)} department(s) out of date")
+            raise SystemExit(1 if mismatches else 0)
+
+        count = rebuild_rollups()
+        click.echo(f"Rebuilt stats for {count} department(s)")
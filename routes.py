@@ -1,28 +1,474 @@
-from flask import jsonify, request
-from sqlalchemy.exc import IntegrityError
+from flask import Response, g, jsonify, request, stream_with_context
+from sqlalchemy.exc import IntegrityError, StatementError
 from extensions import db
 from models import Employee, Department, Project, employee_project
+from pagination import get_page_args, keyset_page
+from export import EXPORT_FORMATS, iter_employee_records
+from versioning import bump_versions, conditional, table_version
+from cache import LRUCache, MISSING
+from codes import allocate_code
+from events import record_change
+from sync import (
+    SyncExpired, touch, record_deletions, parse_updated_since, sync_watermark, get_deleted_ids, format_timestamp
+)
+from serializers import EMPLOYEE, PROJECT, PROJECT_MEMBER, DEPARTMENT
+from streaming import get_stream_arg, iter_id_chunks, json_array_response
+from staffing import parse_window, overlaps, window_days, busy_days
+from replicas import replica_names
+from rollups import (
+    record_employees, record_assignments, record_employee_move, record_employee_set,
+    record_membership_set, merge_department, remove_department, remove_project, get_department_stats
+)
 from datetime import datetime
-import random, string, re
+from collections import defaultdict
+from itertools import chain
+import re, json, math
+
+# Tables each read route is built from; any write to one of them changes
+# the route's ETag.
+EMPLOYEE_TABLES = ("employees", "projects", "employee_project")
+PROJECT_TABLES = ("projects", "employees", "employee_project")
+DEPARTMENT_TABLES = ("departments",)
+EXPORT_TABLES = ("employees", "departments", "projects", "employee_project")
+STATS_TABLES = ("departments", "employees", "employee_project")
+SNAPSHOT_TABLES = ("departments", "employees", "projects", "employee_project")
+
+DEPARTMENT_DELETE_POLICIES = ("nullify", "reassign", "cascade")
+PROJECT_DELETE_POLICIES = ("cascade", "reassign")
+ASSIGNMENT_ATTEMPTS = 3
 
 def register_routes(app):
 
+    # Departments and projects change rarely but are read on almost every
+    # request, so their serialized form is cached per process. Entries are
+    # stored with the table version they were read at and only served while
+    # it is current, so a write made by another worker is seen at once (and
+    # the body always matches the ETag). Writes below also drop their own
+    # entries right away.
+    department_cache = LRUCache(app.config['LOOKUP_CACHE_SIZE'], app.config['LOOKUP_CACHE_TTL'])
+    project_cache = LRUCache(app.config['LOOKUP_CACHE_SIZE'], app.config['LOOKUP_CACHE_TTL'])
+    app.extensions["lookup_caches"] = {"departments": department_cache, "projects": project_cache}
+
+    # A replica can be behind the primary, so each database a request may
+    # read from (see replicas.py) gets its own entries: rows loaded from a
+    # lagging replica are never served to a read-your-writes request on the
+    # primary, and the two do not keep replacing each other's entries.
+    read_targets = ["primary", *replica_names(app.config)]
+
+    def lookup_key(key):
+        return (g.get("db_replica_name") or "primary", key)
+
+    def invalidate_lookups(cache, *keys):
+        cache.invalidate(*((target, key) for target in read_targets for key in keys))
+
     # -------------------------------
     # Helper Functions
     # -------------------------------
     def parse_date(date_value, field_name):
         if not date_value:
             raise ValueError(f"{field_name} is required")
+        if not isinstance(date_value, str):
+            raise ValueError(f"Invalid {field_name} format. Use yyyy-mm-dd")
         try:
             return datetime.strptime(date_value, "%Y-%m-%d").date()
         except ValueError:
             raise ValueError(f"Invalid {field_name} format. Use yyyy-mm-dd")
 
-    def generate_unique_code(model, field_name, length):
-        while True:
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
-            if not db.session.query(model).filter(getattr(model, field_name) == code).first():
-                return code
+    # The overlap queries assume start_date <= end_date; an inverted range
+    # would never match any window.
+    def check_date_range(start_date, end_date):
+        if start_date and end_date and start_date > end_date:
+            raise ValueError("end_date must not be before start_date")
+
+    # Allocated codes never repeat, so the unique constraint can only trip on
+    # a legacy randomly generated code; move on to the next code when it does.
+    def commit_with_code(build, code_name, table_name, attempts=5):
+        for _ in range(attempts):
+            obj = build(allocate_code(code_name))
+            try:
+                db.session.add(obj)
+                bump_versions(table_name)
+                record_change(table_name, "create", [obj.id])
+                db.session.commit()
+                return obj
+            except IntegrityError:
+                db.session.rollback()
+        return None
+
+    # Batched association loading: one query over employee_project for any
+    # number of rows, instead of one SELECT + one get() per assignment.
+    def load_projects_by_employee(employee_ids=None, serializer=PROJECT):
+        query = db.session.query(employee_project.c.employee_id, employee_project.c.project_id)
+        if employee_ids is not None:
+            query = query.filter(employee_project.c.employee_id.in_(employee_ids))
+        # (employee_id, project_id) follows the primary key, so an IN list
+        # is a range lookup per id, and each employee's projects still come
+        # out ordered by id.
+        rows = query.order_by(employee_project.c.employee_id, employee_project.c.project_id).all()
+
+        projects = get_project_dicts({project_id for _, project_id in rows})
+        if serializer is not PROJECT:
+            projects = {project_id: serializer.from_dict(p) for project_id, p in projects.items()}
+        grouped = defaultdict(list)
+        for employee_id, project_id in rows:
+            if project_id in projects:
+                grouped[employee_id].append(projects[project_id])
+        return grouped
+
+    # Resolves project ids to serialized projects through the cache; all
+    # misses are loaded with a single IN query.
+    def get_project_dicts(project_ids):
+        projects = {}
+        missing = []
+        version = table_version("projects") if project_ids else None
+        for project_id in project_ids:
+            cached = project_cache.get(lookup_key(project_id), version)
+            if cached is MISSING:
+                missing.append(project_id)
+            else:
+                projects[project_id] = cached
+
+        if missing:
+            for row in db.session.execute(PROJECT.select().where(Project.id.in_(missing))):
+                projects[row.id] = PROJECT.from_row(row)
+                project_cache.set(lookup_key(row.id), projects[row.id], version)
+        return projects
+
+    # The project id is selected after the member columns so each row can be
+    # passed to the serializer as is.
+    def load_employees_by_project(project_ids=None, serializer=PROJECT_MEMBER):
+        query = db.session.query(*serializer.columns, employee_project.c.project_id).join(
+            employee_project, Employee.id == employee_project.c.employee_id
+        )
+        if project_ids is not None:
+            query = query.filter(employee_project.c.project_id.in_(project_ids))
+
+        grouped = defaultdict(list)
+        for row in query.order_by(Employee.id):
+            grouped[row.project_id].append(serializer.from_row(row))
+        return grouped
+
+    # Type checks for values that go straight into INSERT/UPDATE parameters;
+    # a wrong type would otherwise fail inside the driver.
+    def parse_salary(value):
+        # The frontend posts the form field as a string, "" when left empty.
+        if value is None or value == "":
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError("salary must be a number")
+        try:
+            salary = float(value)
+        except ValueError:
+            raise ValueError("salary must be a number")
+        if not math.isfinite(salary):
+            raise ValueError("salary must be a number")
+        return salary
+
+    def check_location(value):
+        if value is not None and not isinstance(value, str):
+            raise ValueError("location must be a string")
+
+    def check_department_id(value):
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            raise ValueError("department_id must be an integer")
+
+    def validate_employee_payload(data):
+        name = data.get('name')
+        email = data.get('email')
+        join_date = data.get('join_date')
+
+        if not name or not isinstance(name, str) or not Employee.is_valid_name(name):
+            raise ValueError("Invalid name. Name should contain only alphabets")
+        if not email or not isinstance(email, str) or not Employee.is_valid_email(email):
+            raise ValueError("Invalid email format. Email must end with .com")
+        if join_date and not isinstance(join_date, str):
+            raise ValueError("Invalid join_date format. Use yyyy-mm-dd")
+        salary = parse_salary(data.get('salary'))
+        check_department_id(data.get('department_id'))
+
+        return {
+            "name": name,
+            "email": email,
+            "salary": salary,
+            "join_date": parse_date(join_date, "join_date"),
+            "department_id": data.get('department_id')
+        }
+
+    def iter_ndjson(stream):
+        index = 0
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError:
+                yield index, ValueError("Invalid JSON")
+            index += 1
+
+    # Inserts one chunk of validated rows as a single executemany in its own
+    # transaction. Emails already taken are reported up front with one lookup;
+    # if the insert still fails (a constraint hit by a concurrent insert, or a
+    # value the database rejects), the chunk is retried row by row so only
+    # the offending rows fail.
+    def insert_employee_chunk(chunk, errors):
+        emails = [row["email"] for _, row in chunk]
+        taken = {email for (email,) in db.session.query(Employee.email).filter(Employee.email.in_(emails))}
+
+        pending = []
+        for index, row in chunk:
+            if row["email"] in taken:
+                errors.append({"index": index, "error": "Email already exists"})
+                continue
+            taken.add(row["email"])
+            pending.append((index, row))
+
+        if not pending:
+            return 0
+
+        try:
+            db.session.execute(Employee.__table__.insert(), [row for _, row in pending])
+            record_employees((row["department_id"], row["salary"]) for _, row in pending)
+            bump_versions("employees")
+            # executemany does not return the new ids; look them up by email.
+            created_ids = db.session.query(Employee.id).filter(
+                Employee.email.in_([row["email"] for _, row in pending])
+            ).order_by(Employee.id)
+            record_change("employees", "create", [employee_id for (employee_id,) in created_ids])
+            db.session.commit()
+            return len(pending)
+        except StatementError:
+            db.session.rollback()
+
+        created = 0
+        for index, row in pending:
+            try:
+                result = db.session.execute(Employee.__table__.insert(), row)
+                record_employees([(row["department_id"], row["salary"])])
+                bump_versions("employees")
+                record_change("employees", "create", result.inserted_primary_key)
+                db.session.commit()
+                created += 1
+            except IntegrityError:
+                db.session.rollback()
+                errors.append({"index": index, "error": "Email already exists or invalid department_id"})
+            except StatementError:
+                db.session.rollback()
+                errors.append({"index": index, "error": "Row rejected by the database"})
+        return created
+
+    def like_prefix(value):
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return escaped + "%"
+
+    # Translates the search query string into indexed SQL predicates.
+    # Returns None when no filter was given so callers can keep the
+    # cheap unfiltered path.
+    def employee_filters(args):
+        filters = []
+
+        q = args.get('q', '').strip()
+        if q:
+            filters.append(db.or_(
+                Employee.name.like(like_prefix(q), escape="\\"),
+                Employee.email.like(like_prefix(q), escape="\\")
+            ))
+        # Opt-in: the start of any word of the name ("smi" finds "John
+        # Smith"). Later words cannot use the name index, so this scans.
+        word = args.get('word', '').strip()
+        if word:
+            filters.append(db.or_(
+                Employee.name.like(like_prefix(word), escape="\\"),
+                Employee.name.like("% " + like_prefix(word), escape="\\")
+            ))
+        if args.get('name'):
+            filters.append(Employee.name.like(like_prefix(args['name']), escape="\\"))
+        if args.get('email'):
+            filters.append(Employee.email.like(like_prefix(args['email']), escape="\\"))
+
+        try:
+            if args.get('department_id'):
+                filters.append(Employee.department_id == int(args['department_id']))
+            if args.get('project_id'):
+                filters.append(Employee.id.in_(
+                    db.select(employee_project.c.employee_id)
+                    .where(employee_project.c.project_id == int(args['project_id']))
+                ))
+            if args.get('min_salary'):
+                filters.append(Employee.salary >= float(args['min_salary']))
+            if args.get('max_salary'):
+                filters.append(Employee.salary <= float(args['max_salary']))
+        except ValueError:
+            raise ValueError("department_id, project_id and salary filters must be numbers")
+
+        if args.get('joined_after'):
+            filters.append(Employee.join_date >= parse_date(args['joined_after'], "joined_after"))
+        if args.get('joined_before'):
+            filters.append(Employee.join_date <= parse_date(args['joined_before'], "joined_before"))
+
+        return filters or None
+
+    # Response dicts come from the compiled serializers in serializers.py,
+    # which read plain result rows; read routes select only those columns.
+    def load_department(id):
+        row = db.session.execute(DEPARTMENT.select().where(Department.id == id)).first()
+        return DEPARTMENT.from_row(row) if row else None
+
+    def load_project(id):
+        row = db.session.execute(PROJECT.select().where(Project.id == id)).first()
+        return PROJECT.from_row(row) if row else None
+
+    def split_fields(value):
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    # Sparse fieldsets: ?fields=id,name restricts the columns loaded for the
+    # primary rows, ?include=<relation> embeds the relation and
+    # ?fields[<relation>]=... restricts its fields. Without ?fields the
+    # relation is embedded as before unless ?include says otherwise.
+    # Returns the row serializer and the relation serializer, which is None
+    # when the relation is not wanted (and its lookup can be skipped).
+    def get_fieldset(args, serializer, relation, relation_serializer):
+        fields = args.get('fields')
+        if 'include' in args:
+            includes = split_fields(args['include'])
+            if set(includes) - {relation}:
+                raise ValueError(f"include must be empty or {relation}")
+            embed_relation = relation in includes
+        else:
+            embed_relation = fields is None
+
+        if fields is not None:
+            serializer = serializer.only(split_fields(fields))
+        relation_serializer = relation_serializer.only(split_fields(args.get(f'fields[{relation}]', '')))
+        return serializer, relation_serializer if embed_relation else None
+
+    # Delta sync: ?updated_since=<ISO timestamp> on a list route returns
+    # {"items": rows changed since, "deleted": ids deleted since,
+    #  "synced_at": value to send as updated_since next time}.
+    def get_updated_since(args, page=None):
+        if 'updated_since' not in args:
+            return None
+        if page is not None:
+            raise ValueError("updated_since cannot be combined with limit/after")
+        return parse_updated_since(args['updated_since'])
+
+    def delta_response(entity, since, synced_at, items):
+        return jsonify({
+            "items": items,
+            "deleted": get_deleted_ids(entity, since),
+            "synced_at": format_timestamp(synced_at)
+        }), 200
+
+    # PATCH bodies: only the given fields are written, in one UPDATE.
+    def get_changes(data, allowed):
+        if not isinstance(data, dict) or not data:
+            raise ValueError("No data provided")
+        unknown = set(data) - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+        return dict(data)
+
+    def require_text(changes, field):
+        if field in changes and (not isinstance(changes[field], str) or not changes[field].strip()):
+            raise ValueError(f"{field} must be a non-empty string")
+
+    def validate_employee_changes(data):
+        changes = get_changes(data, ("name", "email", "salary", "join_date", "department_id"))
+        if 'name' in changes and (not isinstance(changes['name'], str) or not Employee.is_valid_name(changes['name'])):
+            raise ValueError("Invalid name. Only alphabets and spaces are allowed")
+        if 'email' in changes and (not isinstance(changes['email'], str) or not Employee.is_valid_email(changes['email'])):
+            raise ValueError("Invalid email. Must contain @ and end with .com")
+        if 'join_date' in changes:
+            changes['join_date'] = parse_date(changes['join_date'], "join_date")
+        if 'salary' in changes:
+            changes['salary'] = parse_salary(changes['salary'])
+        check_department_id(changes.get('department_id'))
+        return changes
+
+    def parse_ids(value):
+        if not value:
+            raise ValueError("ids is required, e.g. ?ids=1,2,3")
+        try:
+            return list(dict.fromkeys(int(i) for i in value.split(",") if i.strip()))
+        except ValueError:
+            raise ValueError("ids must be a comma-separated list of integers")
+
+    # Locks the rows (in id order, so bulk writers cannot deadlock) before
+    # the rollup pre-image is read: two concurrent writes to the same
+    # employee would otherwise both subtract the same old values.
+    def existing_employee_ids(ids):
+        return db.session.scalars(
+            db.select(Employee.id).where(Employee.id.in_(ids)).order_by(Employee.id).with_for_update()
+        ).all()
+
+    # Set-based employee writes: one UPDATE/DELETE for any number of rows.
+    # Rollups are adjusted from grouped queries over the same ids, so the
+    # cost grows with the number of departments touched, not of employees.
+    # Return the ids that existed (and were changed).
+    def update_employees(ids, changes, event_changes):
+        existing = existing_employee_ids(ids)
+        if not existing:
+            return existing
+        condition = Employee.id.in_(existing)
+        moves = 'department_id' in changes
+        adjusts_rollups = moves or 'salary' in changes
+
+        if adjusts_rollups:
+            record_employee_set(condition, sign=-1, memberships=moves)
+        db.session.execute(
+            db.update(Employee).where(condition).values(**changes),
+            execution_options={"synchronize_session": False}
+        )
+        if adjusts_rollups:
+            record_employee_set(condition, memberships=moves)
+
+        bump_versions("employees")
+        record_change("employees", "update", existing, changes=event_changes)
+        db.session.commit()
+        return existing
+
+    def delete_employees(ids):
+        existing = existing_employee_ids(ids)
+        if not existing:
+            return existing
+
+        record_employee_set(Employee.id.in_(existing), sign=-1)
+        remove_employees(existing)
+        bump_versions("employees", "employee_project")
+        record_change("employees", "delete", existing)
+        db.session.commit()
+        return existing
+
+    # The base-table part of deleting employees (rollups are up to the
+    # caller): their memberships, the rows themselves and tombstones.
+    def remove_employees(ids):
+        touch(Project, Project.id.in_(
+            db.select(employee_project.c.project_id).where(employee_project.c.employee_id.in_(ids))
+        ))
+        record_deletions("employees", ids)
+        db.session.execute(employee_project.delete().where(employee_project.c.employee_id.in_(ids)))
+        db.session.execute(db.delete(Employee).where(Employee.id.in_(ids)),
+                           execution_options={"synchronize_session": False})
+
+    # Delete policies: what happens to the rows that reference a deleted
+    # department or project. ?policy=reassign also takes ?to=<id>.
+    def get_delete_policy(args, policies, default):
+        policy = args.get('policy', default)
+        if policy not in policies:
+            raise ValueError(f"policy must be one of: {', '.join(policies)}")
+        target_id = None
+        if policy == "reassign":
+            try:
+                target_id = int(args['to'])
+            except (KeyError, ValueError):
+                raise ValueError("policy=reassign requires ?to=<id>")
+        elif 'to' in args:
+            raise ValueError("to is only used with policy=reassign")
+        return policy, target_id
+
+    def embed(item, relation, grouped, key):
+        if grouped is not None:
+            item[relation] = grouped.get(key, [])
+        return item
 
     # -------------------------------
     # Home Route
@@ -31,6 +477,13 @@ def register_routes(app):
     def home():
         return jsonify({"message": "Employee Tracker API is running!"})
 
+    @app.route("/cache/stats")
+    def cache_stats():
+        return jsonify({
+            "departments": department_cache.stats(),
+            "projects": project_cache.stats()
+        }), 200
+
     # -------------------------------
     # EMPLOYEE CRUD ROUTES
     # -------------------------------
@@ -40,32 +493,16 @@ def register_routes(app):
         if not data:
             return jsonify({"error": "Request body must be JSON"}), 400
 
-        name = data.get('name')
-        email = data.get('email')
-        salary = data.get('salary')
-        join_date = data.get('join_date')
-        department_id = data.get('department_id')
-
-        if not name or not Employee.is_valid_name(name):
-            return jsonify({"error": "Invalid name. Name should contain only alphabets"}), 400
-        if not email or not Employee.is_valid_email(email):
-            return jsonify({"error": "Invalid email format. Email must end with .com"}), 400
-
         try:
-            join_date_obj = parse_date(join_date, "join_date")
+            new_employee = Employee(**validate_employee_payload(data))
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
 
-        new_employee = Employee(
-            name=name,
-            email=email,
-            salary=salary,
-            join_date=join_date_obj,
-            department_id=department_id
-        )
-
         try:
             db.session.add(new_employee)
+            record_employees([(new_employee.department_id, new_employee.salary)])
+            bump_versions("employees")
+            record_change("employees", "create", [new_employee.id])
             db.session.commit()
         except IntegrityError:
             db.session.rollback()
@@ -73,96 +510,176 @@ def register_routes(app):
 
         return jsonify({"message": "Employee created successfully", "id": new_employee.id}), 201
 
+    # -------------------------------
+    # BULK EMPLOYEE CREATION
+    # -------------------------------
+    @app.route('/employees/bulk', methods=['POST'])
+    def create_employees_bulk():
+        if request.mimetype == 'application/x-ndjson':
+            records = iter_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, list):
+                return jsonify({"error": "Request body must be a JSON array or NDJSON"}), 400
+            records = enumerate(data)
+
+        chunk_size = app.config['BULK_INSERT_CHUNK_SIZE']
+        created = 0
+        errors = []
+        chunk = []
+
+        for index, record in records:
+            if isinstance(record, Exception):
+                errors.append({"index": index, "error": str(record)})
+                continue
+            if not isinstance(record, dict):
+                errors.append({"index": index, "error": "Each row must be a JSON object"})
+                continue
+            try:
+                chunk.append((index, validate_employee_payload(record)))
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+                continue
+
+            if len(chunk) >= chunk_size:
+                created += insert_employee_chunk(chunk, errors)
+                chunk = []
+
+        if chunk:
+            created += insert_employee_chunk(chunk, errors)
+
+        errors.sort(key=lambda err: err["index"])
+        return jsonify({
+            "message": f"{created} employees created",
+            "created": created,
+            "failed": len(errors),
+            "errors": errors
+        }), 201 if created else 400
+
     @app.route('/employees', methods=['GET'])
+    @conditional(*EMPLOYEE_TABLES)
     def get_employees():
-        employees = Employee.query.all()
-        result = []
-
-        for e in employees:
-            assigned_projects = db.session.execute(
-                employee_project.select().where(employee_project.c.employee_id == e.id)
-            ).fetchall()
+        try:
+            page = get_page_args(request.args, ("id", "join_date", "name"))
+            filters = employee_filters(request.args)
+            serializer, project_serializer = get_fieldset(request.args, EMPLOYEE, "projects", PROJECT)
+            since = get_updated_since(request.args, page)
+            stream = get_stream_arg(request.args, paged=page is not None or since is not None)
+        except SyncExpired as e:
+            return jsonify({"error": str(e)}), 410
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-            projects = [Project.query.get(row.project_id) for row in assigned_projects]
+        # id (and the sort column) are always loaded for grouping and cursors.
+        query = db.session.query(*serializer.columns_with("id", page[1] if page else "id"))
+        if filters:
+            query = query.filter(*filters)
+        if since:
+            synced_at = sync_watermark()
+            query = query.filter(Employee.updated_at >= since).order_by(Employee.id)
+
+        def encode_employees(employees):
+            projects_by_employee = None
+            if project_serializer:
+                projects_by_employee = load_projects_by_employee([e.id for e in employees], project_serializer)
+            return [embed(serializer.from_row(e), "projects", projects_by_employee, e.id) for e in employees]
+
+        # Large lists are streamed chunk by chunk: the first
+        # STREAM_ROW_THRESHOLD + 1 rows decide, so small lists still cost
+        # a single query and keep the buffered response.
+        if page is None and not since and stream is not False:
+            threshold = 0 if stream else app.config['STREAM_ROW_THRESHOLD']
+            employees = query.order_by(Employee.id).limit(threshold + 1).all()
+            if len(employees) > threshold:
+                rest = iter_id_chunks(query, Employee, app.config['STREAM_CHUNK_SIZE'], employees[-1].id)
+                return json_array_response(map(encode_employees, chain([employees], rest)))
+        elif page is None:
+            employees = query.all()
+
+        if page is None:
+            projects_by_employee = None
+            if project_serializer:
+                employee_ids = [e.id for e in employees] if filters or since else None
+                projects_by_employee = load_projects_by_employee(employee_ids, project_serializer)
+            result = [embed(serializer.from_row(e), "projects", projects_by_employee, e.id) for e in employees]
+            if since:
+                return delta_response("employees", since, synced_at, result)
+            return jsonify(result), 200
+
+        limit, sort, after = page
+        try:
+            employees, next_cursor = keyset_page(query, Employee, limit, sort, after)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-            result.append({
-                "id": e.id,
-                "name": e.name,
-                "email": e.email,
-                "salary": e.salary,
-                "join_date": str(e.join_date),
-                "department_id": e.department_id,
-                "projects": [
-                    {"id": p.id, "title": p.title, "description": p.description,
-                     "start_date": str(p.start_date), "end_date": str(p.end_date),
-                     "project_code": p.project_code}
-                    for p in projects if p
-                ]
-            })
+        projects_by_employee = None
+        if project_serializer:
+            projects_by_employee = load_projects_by_employee([e.id for e in employees], project_serializer)
+        return jsonify({
+            "items": [embed(serializer.from_row(e), "projects", projects_by_employee, e.id) for e in employees],
+            "next_cursor": next_cursor
+        }), 200
 
-        return jsonify(result), 200
 
+    # -------------------------------
+    # STREAMING EMPLOYEE EXPORT
+    # -------------------------------
+    @app.route('/employees/export', methods=['GET'])
+    @conditional(*EXPORT_TABLES)
+    def export_employees():
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": "format must be csv or ndjson"}), 400
+
+        generate, mimetype = EXPORT_FORMATS[fmt]
+        chunk_size = app.config['EXPORT_CHUNK_SIZE']
+        body = generate(iter_employee_records(chunk_size), chunk_size)
+
+        return Response(
+            stream_with_context(body),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename=employees.{fmt}"}
+        )
 
     @app.route('/employees/<int:id>', methods=['GET'])
+    @conditional(*EMPLOYEE_TABLES)
     def get_employee(id):
-        e = Employee.query.get(id)
+        try:
+            serializer, project_serializer = get_fieldset(request.args, EMPLOYEE, "projects", PROJECT)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        e = db.session.query(*serializer.columns_with("id")).filter(Employee.id == id).first()
         if not e:
             return jsonify({"error": "Employee not found"}), 404
 
-        assigned_projects = db.session.execute(
-            employee_project.select().where(employee_project.c.employee_id == e.id)
-        ).fetchall()
-
-        projects = [Project.query.get(row.project_id) for row in assigned_projects]
-
-        return jsonify({
-            "id": e.id,
-            "name": e.name,
-            "email": e.email,
-            "salary": e.salary,
-            "join_date": str(e.join_date),
-            "department_id": e.department_id,
-            "projects": [
-                {"id": p.id, "title": p.title, "description": p.description,
-                 "start_date": str(p.start_date), "end_date": str(p.end_date),
-                 "project_code": p.project_code}
-                for p in projects if p
-           ]
-        }), 200
+        projects_by_employee = load_projects_by_employee([id], project_serializer) if project_serializer else None
+        return jsonify(embed(serializer.from_row(e), "projects", projects_by_employee, id)), 200
     
     # -------------------------------
     # GET ALL PROJECTS ASSIGNED TO AN EMPLOYEE
     # -------------------------------
     @app.route('/employees/<int:emp_id>/projects', methods=['GET'])
+    @conditional(*EMPLOYEE_TABLES)
     def get_employee_projects(emp_id):
-        emp = Employee.query.get(emp_id)
+        try:
+            serializer = PROJECT.only(split_fields(request.args.get('fields', '')))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        emp = db.session.query(Employee.id).filter(Employee.id == emp_id).first()
         if not emp:
             return jsonify({"error": "Employee not found"}), 404
 
-        # Get all project IDs assigned to this employee
-        assigned_rows = db.session.execute(
-            employee_project.select().where(employee_project.c.employee_id == emp_id)
-        ).fetchall()
-
-        projects = [Project.query.get(row.project_id) for row in assigned_rows]
-
-        return jsonify([
-            {
-                "id": p.id,
-                "title": p.title,
-                "description": p.description,
-                "start_date": str(p.start_date),
-                "end_date": str(p.end_date),
-                "project_code": p.project_code,
-                "department": p.department.name if p.department else "-"
-            } for p in projects if p
-        ]), 200
+        projects = load_projects_by_employee([emp_id], serializer).get(emp_id, [])
+        return jsonify(projects), 200
 
 
 
     @app.route('/employees/<int:id>', methods=['PUT'])
     def update_employee(id):
-        emp = Employee.query.get(id)
+        # Locked: the old salary and department are subtracted from the rollups.
+        emp = db.session.get(Employee, id, with_for_update=True)
         if not emp:
             return jsonify({"error": "Employee not found"}), 404
 
@@ -175,43 +692,106 @@ def register_routes(app):
         salary = data.get('salary', emp.salary)
         department_id = data.get('department_id', emp.department_id)
 
-        if not Employee.is_valid_name(name):
+        if not isinstance(name, str) or not Employee.is_valid_name(name):
             return jsonify({"error": "Invalid name. Only alphabets and spaces are allowed"}), 400
 
-        if not Employee.is_valid_email(email):
+        if not isinstance(email, str) or not Employee.is_valid_email(email):
             return jsonify({"error": "Invalid email. Must contain @ and end with .com"}), 400
 
 
         join_date_obj = emp.join_date
-        if data.get('join_date'):
-            try:
+        try:
+            if data.get('join_date'):
                 join_date_obj = parse_date(data['join_date'], "join_date")
-            except ValueError as e:
-                return jsonify({"error": str(e)}), 400
+            salary = parse_salary(salary)
+            check_department_id(department_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Check if anything actually changed
         if (emp.name == name and emp.email == email and emp.salary == salary
             and emp.department_id == department_id and emp.join_date == join_date_obj):
             return jsonify({"message": "Same information, nothing to update"}), 200
 
+        record_employees([(emp.department_id, emp.salary)], sign=-1)
+        record_employees([(department_id, salary)])
+        record_employee_move(emp.id, emp.department_id, department_id)
+
         emp.name = name
         emp.email = email
         emp.salary = salary
         emp.join_date = join_date_obj
         emp.department_id = department_id
 
+        bump_versions("employees")
+        record_change("employees", "update", [emp.id])
         db.session.commit()
         return jsonify({"message": "Employee updated successfully"}), 200
 
+    @app.route('/employees/<int:id>', methods=['PATCH'])
+    def patch_employee(id):
+        data = request.get_json(silent=True)
+        try:
+            changes = validate_employee_changes(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            if not update_employees([id], changes, data):
+                return jsonify({"error": "Employee not found"}), 404
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "Email already exists or department does not exist"}), 400
+        return jsonify({"message": "Employee updated successfully"}), 200
+
     @app.route('/employees/<int:id>', methods=['DELETE'])
     def delete_employee(id):
-        emp = Employee.query.get(id)
-        if not emp:
+        if not delete_employees([id]):
             return jsonify({"error": "Employee not found"}), 404
-        db.session.delete(emp)
-        db.session.commit()
         return jsonify({"message": "Employee deleted successfully"}), 200
 
+    # -------------------------------
+    # BULK EMPLOYEE UPDATE / DELETE
+    # -------------------------------
+    # PATCH /employees?ids=1,2,3 with {"salary": ...} sets the same values on
+    # every listed employee; DELETE /employees?ids=1,2,3 removes them. Both
+    # report how many rows were affected and which ids did not exist.
+    @app.route('/employees', methods=['PATCH'])
+    def patch_employees():
+        data = request.get_json(silent=True)
+        try:
+            ids = parse_ids(request.args.get('ids'))
+            changes = validate_employee_changes(data)
+            if 'email' in changes and len(ids) > 1:
+                raise ValueError("email can only be changed for one employee at a time")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            updated = update_employees(ids, changes, data)
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "Email already exists or department does not exist"}), 400
+        return jsonify({
+            "message": f"{len(updated)} employees updated",
+            "updated": len(updated),
+            "not_found": sorted(set(ids) - set(updated))
+        }), 200
+
+    @app.route('/employees', methods=['DELETE'])
+    def delete_employees_bulk():
+        try:
+            ids = parse_ids(request.args.get('ids'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        deleted = delete_employees(ids)
+        return jsonify({
+            "message": f"{len(deleted)} employees deleted",
+            "deleted": len(deleted),
+            "not_found": sorted(set(ids) - set(deleted))
+        }), 200
+
     # -------------------------------
     # DEPARTMENT CRUD ROUTES
     # -------------------------------
@@ -223,12 +803,18 @@ def register_routes(app):
 
         if not name:
             return jsonify({"error": "Department name is required"}), 400
+        try:
+            check_location(location)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        dept_code = generate_unique_code(Department, 'dept_code', 4)
-
-        new_dept = Department(name=name, location=location, dept_code=dept_code)
-        db.session.add(new_dept)
-        db.session.commit()
+        new_dept = commit_with_code(
+            lambda code: Department(name=name, location=location, dept_code=code),
+            'dept_code', "departments"
+        )
+        if not new_dept:
+            return jsonify({"error": "Could not allocate a unique dept_code"}), 500
+        invalidate_lookups(department_cache, "all")
 
         return jsonify({
             "message": "Department created successfully",
@@ -237,27 +823,52 @@ def register_routes(app):
         }), 201
 
     @app.route('/departments', methods=['GET'])
+    @conditional(*DEPARTMENT_TABLES)
     def get_departments():
-        departments = Department.query.all()
-        return jsonify([{
-            "id": d.id,
-            "name": d.name,
-            "location": d.location,
-            "dept_code": d.dept_code
-        } for d in departments]), 200
+        try:
+            since = get_updated_since(request.args)
+        except SyncExpired as e:
+            return jsonify({"error": str(e)}), 410
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if since:
+            synced_at = sync_watermark()
+            rows = db.session.execute(DEPARTMENT.select().where(Department.updated_at >= since).order_by(Department.id))
+            return delta_response("departments", since, synced_at, [DEPARTMENT.from_row(row) for row in rows])
+
+        departments = department_cache.get_or_load(
+            lookup_key("all"), lambda: [DEPARTMENT.from_row(row) for row in db.session.execute(DEPARTMENT.select())],
+            table_version("departments")
+        )
+        return jsonify(departments), 200
     
+    # -------------------------------
+    # DEPARTMENT ANALYTICS
+    # -------------------------------
+    # Served from the department_stats rollup, which the write routes keep
+    # up to date, so these read one row per department.
+    @app.route('/departments/stats', methods=['GET'])
+    @conditional(*STATS_TABLES)
+    def get_departments_stats():
+        return jsonify(get_department_stats()), 200
+
+    @app.route('/departments/<int:id>/stats', methods=['GET'])
+    @conditional(*STATS_TABLES)
+    def get_department_stats_by_id(id):
+        stats = get_department_stats(id)
+        if not stats:
+            return jsonify({"error": "Department not found"}), 404
+        return jsonify(stats[0]), 200
+
     @app.route('/departments/<int:id>', methods=['GET'])
+    @conditional(*DEPARTMENT_TABLES)
     def get_department(id):
-        dept = Department.query.get(id)
+        dept = department_cache.get_or_load(lookup_key(id), lambda: load_department(id), table_version("departments"))
         if not dept:
             return jsonify({"error": "Department not found"}), 404
 
-        return jsonify({
-            "id": dept.id,
-            "name": dept.name,
-            "location": dept.location,
-            "dept_code": dept.dept_code
-        }), 200
+        return jsonify(dept), 200
 
 
     @app.route('/departments/<int:id>', methods=['PUT'])
@@ -269,6 +880,10 @@ def register_routes(app):
         data = request.get_json()
         name = data.get('name', dept.name)
         location = data.get('location', dept.location)
+        try:
+            check_location(location)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Check if anything actually changed
         if dept.name == name and dept.location == location:
@@ -276,18 +891,119 @@ def register_routes(app):
 
         dept.name = name
         dept.location = location
+        bump_versions("departments")
+        record_change("departments", "update", [id])
         db.session.commit()
+        invalidate_lookups(department_cache, id, "all")
         return jsonify({"message": "Department updated successfully"}), 200
 
 
+    @app.route('/departments/<int:id>', methods=['PATCH'])
+    def patch_department(id):
+        try:
+            changes = get_changes(request.get_json(silent=True), ("name", "location"))
+            require_text(changes, 'name')
+            check_location(changes.get('location'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if not db.session.execute(db.update(Department).where(Department.id == id).values(**changes)).rowcount:
+            return jsonify({"error": "Department not found"}), 404
+        bump_versions("departments")
+        record_change("departments", "update", [id])
+        db.session.commit()
+        invalidate_lookups(department_cache, id, "all")
+        return jsonify({"message": "Department updated successfully"}), 200
+
+    # -------------------------------
+    # BULK DEPARTMENT TRANSFER
+    # -------------------------------
+    # Moves every employee of one department to another with a single
+    # UPDATE; the rollups move over from the old department's rows.
+    @app.route('/departments/<int:id>/transfer', methods=['POST'])
+    def transfer_department_employees(id):
+        data = request.get_json(silent=True) or {}
+        target_id = data.get('department_id')
+        if not isinstance(target_id, int) or isinstance(target_id, bool):
+            return jsonify({"error": "department_id (target department) must be an integer"}), 400
+        if target_id == id:
+            return jsonify({"error": "Source and target department are the same"}), 400
+
+        found = set(db.session.scalars(db.select(Department.id).where(Department.id.in_([id, target_id]))))
+        if id not in found:
+            return jsonify({"error": "Department not found"}), 404
+        if target_id not in found:
+            return jsonify({"error": "Target department not found"}), 404
+
+        moved = db.session.scalars(
+            db.select(Employee.id).where(Employee.department_id == id).order_by(Employee.id)
+        ).all()
+        if moved:
+            merge_department(id, target_id)
+            db.session.execute(
+                db.update(Employee).where(Employee.department_id == id).values(department_id=target_id),
+                execution_options={"synchronize_session": False}
+            )
+            bump_versions("employees")
+            record_change("employees", "update", moved, changes={"department_id": target_id})
+            db.session.commit()
+        return jsonify({
+            "message": f"{len(moved)} employees transferred",
+            "transferred": len(moved)
+        }), 200
+
+
+    # ?policy=nullify (default) leaves the employees without a department,
+    # reassign moves them to ?to=<department id>, cascade deletes them.
+    # Each is a fixed number of set-based statements, whatever the size of
+    # the department.
     @app.route('/departments/<int:id>', methods=['DELETE'])
     def delete_department(id):
-        dept = Department.query.get(id)
-        if not dept:
+        try:
+            policy, target_id = get_delete_policy(request.args, DEPARTMENT_DELETE_POLICIES, "nullify")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if target_id == id:
+            return jsonify({"error": "Cannot reassign employees to the department being deleted"}), 400
+
+        found = set(db.session.scalars(
+            db.select(Department.id).where(Department.id.in_([id] if target_id is None else [id, target_id]))
+        ))
+        if id not in found:
             return jsonify({"error": "Department not found"}), 404
-        db.session.delete(dept)
+        if target_id is not None and target_id not in found:
+            return jsonify({"error": "Target department not found"}), 404
+
+        employee_ids = db.session.scalars(
+            db.select(Employee.id).where(Employee.department_id == id).order_by(Employee.id)
+        ).all()
+        tables = ["departments", "employees"]
+        if employee_ids and policy == "cascade":
+            remove_employees(employee_ids)
+            tables.append("employee_project")
+            record_change("employees", "delete", employee_ids)
+        elif employee_ids:
+            if policy == "reassign":
+                merge_department(id, target_id)
+            db.session.execute(
+                db.update(Employee).where(Employee.department_id == id).values(department_id=target_id),
+                execution_options={"synchronize_session": False}
+            )
+            record_change("employees", "update", employee_ids, changes={"department_id": target_id})
+
+        remove_department(id)
+        record_deletions("departments", [id])
+        db.session.execute(db.delete(Department).where(Department.id == id),
+                           execution_options={"synchronize_session": False})
+        bump_versions(*tables)
+        record_change("departments", "delete", [id])
         db.session.commit()
-        return jsonify({"message": "Department deleted successfully"}), 200
+        invalidate_lookups(department_cache, id, "all")
+        return jsonify({
+            "message": "Department deleted successfully",
+            "policy": policy,
+            "employees_affected": len(employee_ids)
+        }), 200
 
     # -------------------------------
     # PROJECT CRUD ROUTES
@@ -306,21 +1022,23 @@ def register_routes(app):
         try:
             start_date_obj = parse_date(start_date, "start_date")
             end_date_obj = parse_date(end_date, "end_date")
+            check_date_range(start_date_obj, end_date_obj)
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
 
-        project_code = generate_unique_code(Project, 'project_code', 5)
-
-        new_project = Project(
-            title=title,
-            description=description,
-            start_date=start_date_obj,
-            end_date=end_date_obj,
-            project_code=project_code
+        new_project = commit_with_code(
+            lambda code: Project(
+                title=title,
+                description=description,
+                start_date=start_date_obj,
+                end_date=end_date_obj,
+                project_code=code
+            ),
+            'project_code', "projects"
         )
-
-        db.session.add(new_project)
-        db.session.commit()
+        if not new_project:
+            return jsonify({"error": "Could not allocate a unique project_code"}), 500
+        invalidate_lookups(project_cache, "all")
 
         return jsonify({
             "message": "Project created successfully",
@@ -329,57 +1047,95 @@ def register_routes(app):
         }), 201
 
     @app.route('/projects', methods=['GET'])
+    @conditional(*PROJECT_TABLES)
     def get_projects():
-        projects = Project.query.all()
-        result = []
-
-        for p in projects:
-            assigned_employees = db.session.execute(
-                employee_project.select().where(employee_project.c.project_id == p.id)
-            ).fetchall()
+        try:
+            page = get_page_args(request.args, ("id", "start_date", "title"))
+            serializer, member_serializer = get_fieldset(request.args, PROJECT, "employees", PROJECT_MEMBER)
+            since = get_updated_since(request.args, page)
+            stream = get_stream_arg(request.args, paged=page is not None or since is not None)
+        except SyncExpired as e:
+            return jsonify({"error": str(e)}), 410
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-            employees = [Employee.query.get(row.employee_id) for row in assigned_employees]
+        if since:
+            synced_at = sync_watermark()
+            projects = db.session.query(*serializer.columns_with("id")).filter(Project.updated_at >= since).order_by(Project.id).all()
+            employees_by_project = None
+            if member_serializer:
+                employees_by_project = load_employees_by_project([p.id for p in projects], member_serializer)
+            result = [embed(serializer.from_row(p), "employees", employees_by_project, p.id) for p in projects]
+            return delta_response("projects", since, synced_at, result)
+
+        def encode_projects(projects):
+            employees_by_project = None
+            if member_serializer:
+                employees_by_project = load_employees_by_project([p.id for p in projects], member_serializer)
+            return [embed(serializer.from_row(p), "employees", employees_by_project, p.id) for p in projects]
+
+        # Lists up to STREAM_ROW_THRESHOLD are served from the cached full
+        # rows, so their fields are picked from the cached dicts. On a miss
+        # only the requested fields are read, and the first
+        # STREAM_ROW_THRESHOLD + 1 rows decide: a longer table (or
+        # ?stream=1) is streamed chunk by chunk like get_employees. Only a
+        # read of every field can fill the cache.
+        if page is None:
+            version = table_version("projects")
+            threshold = app.config['STREAM_ROW_THRESHOLD']
+            projects = MISSING if stream else project_cache.get(lookup_key("all"), version)
+            if projects is MISSING:
+                query = db.session.query(*serializer.columns_with("id"))
+                if stream is False:
+                    rows = query.order_by(Project.id).all()
+                else:
+                    cutoff = 0 if stream else threshold
+                    rows = query.order_by(Project.id).limit(cutoff + 1).all()
+                    if len(rows) > cutoff:
+                        rest = iter_id_chunks(query, Project, app.config['STREAM_CHUNK_SIZE'], rows[-1].id)
+                        return json_array_response(map(encode_projects, chain([rows], rest)))
+                if serializer is PROJECT and len(rows) <= threshold:
+                    project_cache.set(lookup_key("all"), [PROJECT.from_row(row) for row in rows], version)
+                items = [(p.id, serializer.from_row(p)) for p in rows]
+            else:
+                items = [(p["id"], serializer.from_dict(p)) for p in projects]
+            employees_by_project = load_employees_by_project(None, member_serializer) if member_serializer else None
+            result = [embed(item, "employees", employees_by_project, project_id) for project_id, item in items]
+            return jsonify(result), 200
+
+        limit, sort, after = page
+        try:
+            query = db.session.query(*serializer.columns_with("id", sort))
+            projects, next_cursor = keyset_page(query, Project, limit, sort, after)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-            result.append({
-                "id": p.id,
-                "title": p.title,
-                "description": p.description,
-                "start_date": str(p.start_date),
-                "end_date": str(p.end_date),
-                "project_code": p.project_code,
-                "employees": [
-                    {"id": e.id, "name": e.name, "email": e.email, "department_id": e.department_id}
-                    for e in employees if e
-               ]
-           })
-
-        return jsonify(result), 200
+        employees_by_project = None
+        if member_serializer:
+            employees_by_project = load_employees_by_project([p.id for p in projects], member_serializer)
+        return jsonify({
+            "items": [
+                embed(serializer.from_row(p), "employees", employees_by_project, p.id)
+                for p in projects
+            ],
+            "next_cursor": next_cursor
+        }), 200
 
     
     @app.route('/projects/<int:id>', methods=['GET'])
+    @conditional(*PROJECT_TABLES)
     def get_project(id):
-        p = Project.query.get(id)
+        try:
+            serializer, member_serializer = get_fieldset(request.args, PROJECT, "employees", PROJECT_MEMBER)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        p = project_cache.get_or_load(lookup_key(id), lambda: load_project(id), table_version("projects"))
         if not p:
             return jsonify({"error": "Project not found"}), 404
 
-        assigned_employees = db.session.execute(
-            employee_project.select().where(employee_project.c.project_id == p.id)
-        ).fetchall()
-
-        employees = [Employee.query.get(row.employee_id) for row in assigned_employees]
-
-        return jsonify({
-            "id": p.id,
-            "title": p.title,
-            "description": p.description,
-            "start_date": str(p.start_date),
-            "end_date": str(p.end_date),
-            "project_code": p.project_code,
-            "employees": [
-                {"id": e.id, "name": e.name, "email": e.email, "department_id": e.department_id}
-                for e in employees if e
-            ]
-        }), 200
+        employees_by_project = load_employees_by_project([id], member_serializer) if member_serializer else None
+        return jsonify(embed(serializer.from_dict(p), "employees", employees_by_project, id)), 200
 
 
 
@@ -407,6 +1163,10 @@ def register_routes(app):
                 end_date_obj = parse_date(data['end_date'], "end_date")
             except ValueError as e:
                 return jsonify({"error": str(e)}), 400
+        try:
+            check_date_range(start_date_obj, end_date_obj)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Check if anything actually changed
         if (p.title == title and p.description == description
@@ -417,101 +1177,398 @@ def register_routes(app):
         p.description = description
         p.start_date = start_date_obj
         p.end_date = end_date_obj
+        bump_versions("projects")
+        record_change("projects", "update", [id])
         db.session.commit()
+        invalidate_lookups(project_cache, id, "all")
         return jsonify({"message": "Project updated successfully"}), 200
 
 
+    @app.route('/projects/<int:id>', methods=['PATCH'])
+    def patch_project(id):
+        try:
+            changes = get_changes(request.get_json(silent=True), ("title", "description", "start_date", "end_date"))
+            require_text(changes, 'title')
+            require_text(changes, 'description')
+            if 'start_date' in changes:
+                changes['start_date'] = parse_date(changes['start_date'], "start_date")
+            if changes.get('end_date') is not None:
+                changes['end_date'] = parse_date(changes['end_date'], "end_date")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # A one-sided change is checked against the stored other date.
+        if 'start_date' in changes or 'end_date' in changes:
+            current = db.session.execute(
+                db.select(Project.start_date, Project.end_date).where(Project.id == id)
+            ).first()
+            if not current:
+                return jsonify({"error": "Project not found"}), 404
+            try:
+                check_date_range(changes.get('start_date', current.start_date),
+                                 changes.get('end_date', current.end_date))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        if not db.session.execute(db.update(Project).where(Project.id == id).values(**changes)).rowcount:
+            return jsonify({"error": "Project not found"}), 404
+        bump_versions("projects")
+        record_change("projects", "update", [id])
+        db.session.commit()
+        invalidate_lookups(project_cache, id, "all")
+        return jsonify({"message": "Project updated successfully"}), 200
+
+
+    # ?policy=cascade (default) drops the project's memberships, reassign
+    # moves them to project ?to=<id> (skipping employees already on it).
     @app.route('/projects/<int:id>', methods=['DELETE'])
     def delete_project(id):
-        p = Project.query.get(id)
-        if not p:
+        try:
+            policy, target_id = get_delete_policy(request.args, PROJECT_DELETE_POLICIES, "cascade")
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if target_id == id:
+            return jsonify({"error": "Cannot reassign members to the project being deleted"}), 400
+
+        found = set(db.session.scalars(
+            db.select(Project.id).where(Project.id.in_([id] if target_id is None else [id, target_id]))
+        ))
+        if id not in found:
             return jsonify({"error": "Project not found"}), 404
-        db.session.delete(p)
+        if target_id is not None and target_id not in found:
+            return jsonify({"error": "Target project not found"}), 404
+
+        members = db.select(employee_project.c.employee_id).where(employee_project.c.project_id == id)
+        affected = db.session.execute(
+            db.select(db.func.count()).select_from(employee_project).where(employee_project.c.project_id == id)
+        ).scalar()
+        remove_project(id)
+        touch(Employee, Employee.id.in_(members))
+
+        if policy == "reassign" and affected:
+            already = db.select(employee_project.c.employee_id).where(employee_project.c.project_id == target_id)
+            moving = members.where(employee_project.c.employee_id.not_in(already))
+            added = db.session.scalars(moving.order_by(employee_project.c.employee_id)).all()
+            if added:
+                db.session.execute(employee_project.insert().from_select(
+                    ["employee_id", "project_id"],
+                    moving.add_columns(db.literal(target_id))
+                ))
+                record_membership_set(target_id, Employee.id.in_(added))
+                touch(Project, Project.id == target_id)
+                record_change("employee_project", "assign", added, project_id=target_id)
+
+        record_deletions("projects", [id])
+        db.session.execute(employee_project.delete().where(employee_project.c.project_id == id))
+        db.session.execute(db.delete(Project).where(Project.id == id),
+                           execution_options={"synchronize_session": False})
+        bump_versions("projects", "employee_project")
+        record_change("projects", "delete", [id])
         db.session.commit()
-        return jsonify({"message": "Project deleted successfully"}), 200
+        invalidate_lookups(project_cache, id, "all")
+        return jsonify({
+            "message": "Project deleted successfully",
+            "policy": policy,
+            "members_affected": affected
+        }), 200
 
     # -------------------------------
     # ASSIGN / UNASSIGN EMPLOYEE TO PROJECT
     # -------------------------------
+    # Both routes accept either {"employee_id": 1} (single, original
+    # responses) or {"employee_ids": [1, 2, ...]} (bulk, reports added /
+    # already present / unknown ids). Either way the work is one validation
+    # query plus one set-based INSERT or DELETE.
+    # The rollups are adjusted for exactly the rows written: if a concurrent
+    # request changed one of the memberships between the read and the write
+    # (the INSERT hits the primary key, or the DELETE removes fewer rows),
+    # the transaction is rolled back and the state read again.
+    def get_assignment_ids(data):
+        if not data:
+            return None
+        if 'employee_ids' in data:
+            ids = data['employee_ids']
+            if not isinstance(ids, list):
+                raise ValueError("employee_ids must be a list")
+        elif 'employee_id' in data:
+            ids = [data['employee_id']]
+        else:
+            return None
+        try:
+            return list(dict.fromkeys(int(i) for i in ids))
+        except (TypeError, ValueError):
+            raise ValueError("employee ids must be integers")
+
+    def load_assignment_state(project_id, employee_ids):
+        rows = db.session.query(
+            Employee.id, Employee.email, Employee.department_id, employee_project.c.project_id
+        ).outerjoin(
+            employee_project,
+            (employee_project.c.employee_id == Employee.id) & (employee_project.c.project_id == project_id)
+        ).filter(Employee.id.in_(employee_ids)).all()
+
+        emails = {row.id: row.email for row in rows}
+        departments = {row.id: row.department_id for row in rows}
+        assigned = {row.id for row in rows if row.project_id is not None}
+        return emails, departments, assigned
+
     @app.route('/projects/<int:project_id>/assign', methods=['POST'])
     def assign_employee_to_project(project_id):
-        data = request.get_json()
-        if not data or 'employee_id' not in data:
+        data = request.get_json(silent=True)
+        try:
+            employee_ids = get_assignment_ids(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if employee_ids is None:
             return jsonify({"error": "employee_id is required"}), 400
 
         project = Project.query.get(project_id)
-        employee = Employee.query.get(data['employee_id'])
-        if not project or not employee:
+        if not project:
             return jsonify({"error": "Invalid employee or project"}), 404
+        title = project.title
 
-        existing = db.session.execute(
-            employee_project.select().where(
-                (employee_project.c.employee_id == employee.id) &
-                (employee_project.c.project_id == project.id)
-            )
-        ).first()
-
-        if existing:
-            return jsonify({"message": "Employee already assigned"}), 400
+        for _ in range(ASSIGNMENT_ATTEMPTS):
+            emails, departments, assigned = load_assignment_state(project_id, employee_ids)
+            added = [i for i in employee_ids if i in emails and i not in assigned]
+            if not added:
+                break
+            try:
+                db.session.execute(
+                    employee_project.insert(),
+                    [{"employee_id": i, "project_id": project_id} for i in added]
+                )
+                record_assignments((departments[i], project_id) for i in added)
+                touch(Employee, Employee.id.in_(added))
+                touch(Project, Project.id == project_id)
+                bump_versions("employee_project")
+                record_change("employee_project", "assign", added, project_id=project_id)
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+        else:
+            return jsonify({"error": "Assignments changed concurrently, please retry"}), 409
+
+        if 'employee_ids' not in data:
+            employee_id = employee_ids[0]
+            if employee_id not in emails:
+                return jsonify({"error": "Invalid employee or project"}), 404
+            if employee_id in assigned:
+                return jsonify({"message": "Employee already assigned"}), 400
+            return jsonify({"message": f"Employee {emails[employee_id]} assigned to {title}"}), 200
 
-        db.session.execute(
-            employee_project.insert().values(employee_id=employee.id, project_id=project.id)
-        )
-        db.session.commit()
-        return jsonify({"message": f"Employee {employee.email} assigned to {project.title}"}), 200
+        return jsonify({
+            "message": f"{len(added)} employees assigned to {title}",
+            "added": added,
+            "already_assigned": [i for i in employee_ids if i in assigned],
+            "unknown": [i for i in employee_ids if i not in emails]
+        }), 200
 
     @app.route('/projects/<int:project_id>/unassign', methods=['POST'])
     def unassign_employee_from_project(project_id):
-        data = request.get_json()
-        if not data or 'employee_id' not in data:
+        data = request.get_json(silent=True)
+        try:
+            employee_ids = get_assignment_ids(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if employee_ids is None:
             return jsonify({"error": "employee_id is required"}), 400
 
         project = Project.query.get(project_id)
-        employee = Employee.query.get(data['employee_id'])
-        if not project or not employee:
+        if not project:
             return jsonify({"error": "Invalid employee or project"}), 404
+        title = project.title
+
+        for _ in range(ASSIGNMENT_ATTEMPTS):
+            emails, departments, assigned = load_assignment_state(project_id, employee_ids)
+            removed = [i for i in employee_ids if i in assigned]
+            if not removed:
+                break
+            deleted = db.session.execute(
+                employee_project.delete().where(
+                    (employee_project.c.project_id == project_id) &
+                    (employee_project.c.employee_id.in_(removed))
+                )
+            ).rowcount
+            if deleted != len(removed):
+                db.session.rollback()
+                continue
+            record_assignments(((departments[i], project_id) for i in removed), sign=-1)
+            touch(Employee, Employee.id.in_(removed))
+            touch(Project, Project.id == project_id)
+            bump_versions("employee_project")
+            record_change("employee_project", "unassign", removed, project_id=project_id)
+            db.session.commit()
+            break
+        else:
+            return jsonify({"error": "Assignments changed concurrently, please retry"}), 409
+
+        if 'employee_ids' not in data:
+            employee_id = employee_ids[0]
+            if employee_id not in emails:
+                return jsonify({"error": "Invalid employee or project"}), 404
+            if employee_id not in assigned:
+                return jsonify({"message": "Employee not assigned"}), 400
+            return jsonify({"message": f"Employee {emails[employee_id]} unassigned from {title}"}), 200
 
-        existing = db.session.execute(
-            employee_project.select().where(
-                (employee_project.c.employee_id == employee.id) &
-                (employee_project.c.project_id == project.id)
-            )
-        ).first()
-
-        if not existing:
-            return jsonify({"message": "Employee not assigned"}), 400
-
-        db.session.execute(
-            employee_project.delete().where(
-                (employee_project.c.employee_id == employee.id) &
-                (employee_project.c.project_id == project.id)
-            )
-        )
-        db.session.commit()
-        return jsonify({"message": f"Employee {employee.email} unassigned from {project.title}"}), 200
+        return jsonify({
+            "message": f"{len(removed)} employees unassigned from {title}",
+            "removed": removed,
+            "not_assigned": [i for i in employee_ids if i in emails and i not in assigned],
+            "unknown": [i for i in employee_ids if i not in emails]
+        }), 200
 
     # -------------------------------
     # GET ALL EMPLOYEES ASSIGNED TO A PROJECT
     # -------------------------------
     @app.route('/projects/<int:project_id>/employees', methods=['GET'])
+    @conditional(*PROJECT_TABLES)
     def get_project_employees(project_id):
-        project = Project.query.get(project_id)
+        try:
+            serializer = PROJECT_MEMBER.only(split_fields(request.args.get('fields', '')))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        project = db.session.query(Project.id).filter(Project.id == project_id).first()
         if not project:
             return jsonify({"error": "Project not found"}), 404
 
-        assigned = db.session.execute(
-            employee_project.select().where(employee_project.c.project_id == project_id)
-        ).fetchall()
+        return jsonify(load_employees_by_project([project_id], serializer).get(project_id, [])), 200
 
-        if not assigned:
-            return jsonify([]), 200
+    # -------------------------------
+    # STAFFING / AVAILABILITY
+    # -------------------------------
+    # Date-window queries (?from=yyyy-mm-dd&to=yyyy-mm-dd, inclusive) answered
+    # with range predicates on ix_projects_end_date_start_date; a project
+    # without an end_date is treated as ongoing.
+    def get_staffing_scope(args):
+        try:
+            department_id = int(args['department_id']) if args.get('department_id') else None
+        except ValueError:
+            raise ValueError("department_id must be a number")
+        ids = parse_ids(args['ids']) if args.get('ids') else None
+        scope = []
+        if department_id is not None:
+            scope.append(Employee.department_id == department_id)
+        if ids is not None:
+            scope.append(Employee.id.in_(ids))
+        return scope
+
+    @app.route('/projects/overlapping', methods=['GET'])
+    @conditional(*PROJECT_TABLES)
+    def get_overlapping_projects():
+        try:
+            window = parse_window(request.args)
+            serializer = PROJECT.only(split_fields(request.args.get('fields', '')))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        employees = [Employee.query.get(row.employee_id) for row in assigned]
-        return jsonify([
-            {
-                "id": e.id,
+        rows = db.session.execute(
+            db.select(*serializer.columns_with("id", "start_date"))
+            .where(overlaps(Project.start_date, Project.end_date, window))
+            .order_by(Project.start_date, Project.id)
+        )
+        return jsonify([serializer.from_row(row) for row in rows]), 200
+
+    # Employees with no project overlapping the window.
+    @app.route('/employees/available', methods=['GET'])
+    @conditional(*EMPLOYEE_TABLES)
+    def get_available_employees():
+        try:
+            window = parse_window(request.args)
+            scope = get_staffing_scope(request.args)
+            serializer = EMPLOYEE.only(split_fields(request.args.get('fields', '')))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        busy = (
+            db.select(employee_project.c.employee_id)
+            .join(Project, Project.id == employee_project.c.project_id)
+            .where(overlaps(Project.start_date, Project.end_date, window))
+        )
+        rows = db.session.query(*serializer.columns_with("id")).filter(
+            *scope, Employee.id.not_in(busy)
+        ).order_by(Employee.id)
+        return jsonify([serializer.from_row(row) for row in rows]), 200
+
+    # Per employee: the projects overlapping the window and how many of its
+    # days they cover (overlapping projects count once).
+    @app.route('/employees/allocation', methods=['GET'])
+    @conditional(*EMPLOYEE_TABLES)
+    def get_employee_allocation():
+        try:
+            window = parse_window(request.args)
+            scope = get_staffing_scope(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        employees = db.session.execute(
+            db.select(Employee.id, Employee.name, Employee.department_id).where(*scope).order_by(Employee.id)
+        ).all()
+        assignments = (
+            db.select(employee_project.c.employee_id, Project.id, Project.start_date, Project.end_date)
+            .join(Project, Project.id == employee_project.c.project_id)
+            .where(overlaps(Project.start_date, Project.end_date, window))
+        )
+        if scope:
+            assignments = assignments.join(Employee, Employee.id == employee_project.c.employee_id).where(*scope)
+
+        projects_by_employee = defaultdict(list)
+        for employee_id, project_id, start_date, end_date in db.session.execute(assignments):
+            projects_by_employee[employee_id].append((project_id, start_date, end_date))
+
+        days = window_days(window)
+        result = []
+        for e in employees:
+            projects = sorted(projects_by_employee.get(e.id, []))
+            allocated = busy_days([(start, end) for _, start, end in projects], window)
+            result.append({
+                "employee_id": e.id,
                 "name": e.name,
-                "email": e.email,
-                "department_id": e.department_id
-            } for e in employees if e
-        ]), 200
+                "department_id": e.department_id,
+                "project_ids": [project_id for project_id, _, _ in projects],
+                "allocated_days": allocated,
+                "free_days": days - allocated
+            })
+        return jsonify({
+            "from": str(window[0]),
+            "to": str(window[1]),
+            "days": days,
+            "employees": result
+        }), 200
+
+    # -------------------------------
+    # ORG SNAPSHOT
+    # -------------------------------
+    # Everything the SPA needs in one response, normalized: each row appears
+    # once and the many-to-many is sent as [employee_id, project_id] pairs.
+    # At most four queries (departments and projects may come from the
+    # lookup caches) regardless of the size of the org.
+    @app.route('/snapshot', methods=['GET'])
+    @conditional(*SNAPSHOT_TABLES)
+    def get_snapshot():
+        departments = department_cache.get_or_load(
+            lookup_key("all"), lambda: [DEPARTMENT.from_row(row) for row in db.session.execute(DEPARTMENT.select())],
+            table_version("departments")
+        )
+        # Same rule as get_projects: only a list up to STREAM_ROW_THRESHOLD
+        # goes into the "all" entry.
+        version = table_version("projects")
+        projects = project_cache.get(lookup_key("all"), version)
+        if projects is MISSING:
+            projects = [PROJECT.from_row(row) for row in db.session.execute(PROJECT.select().order_by(Project.id))]
+            if len(projects) <= app.config['STREAM_ROW_THRESHOLD']:
+                project_cache.set(lookup_key("all"), projects, version)
+        employees = [EMPLOYEE.from_row(row) for row in db.session.execute(EMPLOYEE.select())]
+        edges = [
+            [employee_id, project_id] for employee_id, project_id in db.session.execute(
+                db.select(employee_project.c.employee_id, employee_project.c.project_id)
+                .order_by(employee_project.c.employee_id, employee_project.c.project_id)
+            )
+        ]
+        return jsonify({
+            "departments": departments,
+            "employees": employees,
+            "projects": projects,
+            "employee_project": edges
+        }), 200
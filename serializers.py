@@ -0,0 +1,121 @@
+import json
+from flask.json.provider import DefaultJSONProvider, _default
+from extensions import db
+from models import Employee, Department, Project
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+# -------------------------------
+# Compiled Serializers
+# -------------------------------
+class ModelSerializer:
+    """Turns rows of a fixed column list into response dicts.
+
+    The per-model function is generated once at import time as a single
+    dict literal (no per-field loop or getattr at request time). Select
+    `serializer.columns` and feed the result rows to `from_row`, so no ORM
+    object is ever hydrated; `from_object` accepts anything with matching
+    attributes (ORM instances, named rows) for the few call sites that
+    already hold one.
+    """
+
+    def __init__(self, model, field_names):
+        self.model = model
+        self.field_names = list(field_names)
+        self.columns = [getattr(model, name) for name in self.field_names]
+        self.from_row = self._compile("row[{index}]")
+        self.from_object = self._compile("row.{name}")
+        self.from_dict = self._compile("row[{name!r}]", convert=False)
+        self._subsets = {}
+
+    def _compile(self, accessor, convert=True):
+        items = []
+        for index, (name, column) in enumerate(zip(self.field_names, self.columns)):
+            value = accessor.format(index=index, name=name)
+            # Dates are rendered with str() like the hand-written dicts were.
+            if convert and isinstance(column.type, (db.Date, db.DateTime)):
+                value = f"str({value})"
+            items.append(f"{name!r}: {value}")
+
+        source = "def serialize(row):\n    return {" + ", ".join(items) + "}\n"
+        namespace = {}
+        exec(compile(source, f"<{self.model.__name__} serializer>", "exec"), namespace)
+        return namespace["serialize"]
+
+    def select(self):
+        return db.select(*self.columns)
+
+    def columns_with(self, *names):
+        """This serializer's columns plus any of `names` it does not load.
+
+        The extra columns come last, so `from_row` ignores them; they are
+        for keys the caller needs itself (ids to group by, sort columns).
+        """
+        return self.columns + [getattr(self.model, name) for name in names if name not in self.field_names]
+
+    def only(self, field_names):
+        """Serializer for a subset of the fields, compiled once per subset."""
+        requested = set(field_names)
+        unknown = requested.difference(self.field_names)
+        if unknown:
+            raise ValueError(
+                f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                f"Available: {', '.join(self.field_names)}"
+            )
+        if not requested or requested == set(self.field_names):
+            return self
+
+        key = tuple(name for name in self.field_names if name in requested)
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = self._subsets[key] = ModelSerializer(self.model, key)
+        return subset
+
+
+EMPLOYEE = ModelSerializer(Employee, ["id", "name", "email", "salary", "join_date", "department_id"])
+PROJECT_MEMBER = ModelSerializer(Employee, ["id", "name", "email", "department_id"])
+PROJECT = ModelSerializer(Project, ["id", "title", "description", "start_date", "end_date", "project_code"])
+DEPARTMENT = ModelSerializer(Department, ["id", "name", "location", "dept_code"])
+
+
+# -------------------------------
+# JSON Provider
+# -------------------------------
+ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+def dump_json(obj):
+    """Compact, key-sorted JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, sort_keys=True, separators=(",", ":")).encode()
+
+
+def dump_response_body(obj):
+    """Compact, key-sorted JSON bytes with a trailing newline."""
+    return dump_json(obj) + b"\n"
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when it is installed.
+
+    Output matches the default provider in non-debug mode (sorted keys,
+    compact separators, trailing newline); values orjson does not handle
+    natively, including dates, go through Flask's usual default hook.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None or self._app.debug:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dump_response_body(obj), mimetype=self.mimetype)
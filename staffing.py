@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from extensions import db
+
+MAX_WINDOW_DAYS = 3660
+
+
+# -------------------------------
+# Date Windows
+# -------------------------------
+def parse_window(args):
+    """Return (start, end) from ?from=&to= (yyyy-mm-dd, both inclusive)."""
+    window = []
+    for name in ("from", "to"):
+        value = args.get(name)
+        if not value:
+            raise ValueError(f"{name} is required (yyyy-mm-dd)")
+        try:
+            window.append(datetime.strptime(value, "%Y-%m-%d").date())
+        except ValueError:
+            raise ValueError(f"Invalid {name} format. Use yyyy-mm-dd")
+    start, end = window
+    if start > end:
+        raise ValueError("from must not be after to")
+    if (end - start).days >= MAX_WINDOW_DAYS:
+        raise ValueError(f"The window can be at most {MAX_WINDOW_DAYS} days")
+    return start, end
+
+
+def overlaps(start_column, end_column, window):
+    """SQL condition: [start, end] intersects the window; a NULL end is open-ended.
+
+    Written as two range predicates on the (end_date, start_date) index:
+    projects that ended before the window are skipped by the index.
+    """
+    start, end = window
+    return db.and_(
+        db.or_(end_column >= start, end_column.is_(None)),
+        start_column <= end
+    )
+
+
+def window_days(window):
+    return (window[1] - window[0]).days + 1
+
+
+def busy_days(intervals, window):
+    """Days of the window covered by at least one (start, end) interval."""
+    start, end = window
+    clipped = sorted(
+        (max(s, start), min(e or end, end)) for s, e in intervals
+    )
+    days = 0
+    current_start = current_end = None
+    for s, e in clipped:
+        if s > e:
+            continue
+        if current_end is None or s > current_end + timedelta(days=1):
+            if current_end is not None:
+                days += (current_end - current_start).days + 1
+            current_start, current_end = s, e
+        else:
+            current_end = max(current_end, e)
+    if current_end is not None:
+        days += (current_end - current_start).days + 1
+    return days
@@ -0,0 +1,85 @@
+import zlib
+from flask import Response, current_app, request, stream_with_context
+from serializers import dump_json
+
+
+# -------------------------------
+# Row Source
+# -------------------------------
+def iter_id_chunks(query, model, chunk_size, after_id=None):
+    """Yield lists of up to `chunk_size` rows ordered by id.
+
+    Each chunk is its own query seeking past the last id of the previous
+    one, so only one chunk is held at a time and the connection is free
+    between chunks for per-chunk lookups (a server-side cursor on MySQL
+    would block other queries until fully read).
+    """
+    while True:
+        chunk_query = query if after_id is None else query.filter(model.id > after_id)
+        rows = chunk_query.order_by(model.id).limit(chunk_size).all()
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        after_id = rows[-1].id
+
+
+def get_stream_arg(args, paged=False):
+    """True/False for ?stream=1/0, None to let the row count decide.
+
+    Pages and delta responses are bounded objects, not plain arrays, so
+    they are never streamed.
+    """
+    value = args.get('stream')
+    if value is None:
+        return None
+    if value not in ("0", "1"):
+        raise ValueError("stream must be 0 or 1")
+    if value == "1" and paged:
+        raise ValueError("stream cannot be combined with limit/after or updated_since")
+    return value == "1"
+
+
+# -------------------------------
+# Encoders
+# -------------------------------
+def generate_json_array(chunks):
+    """Encode an iterable of item lists as one JSON array, a chunk at a time.
+
+    The bytes are the same as dump_response_body(list_of_all_items).
+    """
+    yield b"["
+    first = True
+    for items in chunks:
+        if not items:
+            continue
+        body = b",".join(dump_json(item) for item in items)
+        yield body if first else b"," + body
+        first = False
+    yield b"]\n"
+
+
+def gzip_chunks(chunks, level):
+    # Sync-flush after every chunk so the client can decode what it has
+    # received so far instead of waiting for the whole body.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def json_array_response(chunks):
+    """Stream `chunks` (lists of response dicts) as a JSON array.
+
+    Gzipped per chunk when the client accepts it and STREAM_GZIP_LEVEL
+    is above 0.
+    """
+    body = generate_json_array(chunks)
+    headers = {"Vary": "Accept-Encoding"}
+    level = current_app.config['STREAM_GZIP_LEVEL']
+    if level and "gzip" in request.accept_encodings:
+        body = gzip_chunks(body, level)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(body), mimetype="application/json", headers=headers)
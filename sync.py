@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app
+from extensions import db
+from models import Tombstone, utcnow
+
+
+class SyncExpired(ValueError):
+    """updated_since is older than the tombstones we still keep."""
+
+
+# -------------------------------
+# Write Side
+# -------------------------------
+def touch(model, condition):
+    """Bump updated_at on the rows matching `condition` in one UPDATE.
+
+    For changes that do not go through an ORM update of the row itself,
+    e.g. an employee's project list changing on assign/unassign.
+    """
+    db.session.execute(
+        db.update(model).where(condition).values(updated_at=utcnow()),
+        execution_options={"synchronize_session": False}
+    )
+
+
+def record_deletions(entity, ids):
+    """Write tombstones for deleted rows (replacing any older tombstone for a reused id)."""
+    ids = list(ids)
+    if not ids:
+        return
+    table = Tombstone.__table__
+    db.session.execute(table.delete().where((table.c.entity == entity) & (table.c.entity_id.in_(ids))))
+    deleted_at = utcnow()
+    db.session.execute(table.insert(), [
+        {"entity": entity, "entity_id": entity_id, "deleted_at": deleted_at} for entity_id in ids
+    ])
+
+
+# -------------------------------
+# Read Side
+# -------------------------------
+def parse_updated_since(value):
+    """Parse an ISO 8601 timestamp (UTC unless it carries an offset)."""
+    try:
+        since = datetime.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise ValueError("Invalid updated_since. Use an ISO 8601 timestamp, e.g. 2026-01-31T09:30:00Z")
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    horizon = utcnow() - timedelta(days=current_app.config['TOMBSTONE_RETENTION_DAYS'])
+    if since < horizon:
+        raise SyncExpired("updated_since is older than the deletion history kept; do a full sync")
+    return since
+
+
+def sync_watermark():
+    """The updated_since value for the client's next sync.
+
+    Taken before the rows are read and moved back by a safety window, so a
+    transaction that stamped its rows earlier but committed after this read
+    is still picked up next time (at the cost of a few repeated rows).
+    """
+    window = timedelta(seconds=current_app.config['SYNC_SAFETY_WINDOW_SECONDS'])
+    return utcnow() - window
+
+
+def get_deleted_ids(entity, since):
+    rows = db.session.query(Tombstone.entity_id).filter(
+        Tombstone.entity == entity, Tombstone.deleted_at >= since
+    ).order_by(Tombstone.entity_id)
+    return [entity_id for (entity_id,) in rows]
+
+
+def format_timestamp(value):
+    return value.isoformat() + "Z"
+
+
+# -------------------------------
+# Maintenance
+# -------------------------------
+def purge_tombstones(retention_days):
+    horizon = utcnow() - timedelta(days=retention_days)
+    deleted = db.session.execute(Tombstone.__table__.delete().where(Tombstone.deleted_at < horizon)).rowcount
+    db.session.commit()
+    return deleted
+
+
+def init_sync_commands(app):
+    @app.cli.command("purge-tombstones")
+    def purge_tombstones_command():
+        """Delete tombstones older than TOMBSTONE_RETENTION_DAYS."""
+        count = purge_tombstones(app.config['TOMBSTONE_RETENTION_DAYS'])
+        click.echo(f"Purged {count} tombstone(s)")
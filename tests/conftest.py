@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app is a set of top-level modules (app.py, routes.py, ...); make them
+# importable however pytest is started.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
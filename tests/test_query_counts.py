@@ -0,0 +1,74 @@
+"""The read routes load associations in batches, so the number of SQL
+statements a request issues must not grow with the number of rows."""
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import employee_project
+from benchmarks.orggen import seed_org
+
+ROUTES = [
+    "/employees",
+    "/employees/{employee}",
+    "/employees/{employee}/projects",
+    "/projects",
+    "/projects/{project}",
+    "/projects/{project}/employees",
+    "/departments",
+    "/departments/{department}",
+]
+
+SIZES = {
+    "small": {"departments": 3, "employees": 30, "projects": 10},
+    "large": {"departments": 12, "employees": 600, "projects": 80},
+}
+
+
+class QueryCountConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    TESTING = True
+
+
+def count_queries(size):
+    """Statements issued by each route against a freshly seeded org."""
+    app = create_app(QueryCountConfig)
+    with app.app_context():
+        db.create_all()
+        ids = seed_org(**SIZES[size], seed=1)
+        # Detail routes use an employee and a project that have members, so
+        # the association lookups are not skipped.
+        employee_id, project_id = db.session.execute(db.select(employee_project).limit(1)).first()
+
+        statements = []
+        def on_execute(*args):
+            statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+
+        client = app.test_client()
+        counts = {}
+        for route in ROUTES:
+            path = route.format(
+                employee=employee_id,
+                project=project_id,
+                department=ids["departments"][0],
+            )
+            statements.clear()
+            response = client.get(path)
+            assert response.status_code == 200, path
+            counts[route] = len(statements)
+
+        event.remove(db.engine, "before_cursor_execute", on_execute)
+        db.session.remove()
+    return counts
+
+
+@pytest.fixture(scope="module")
+def query_counts():
+    return {size: count_queries(size) for size in SIZES}
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_query_count_does_not_grow_with_rows(query_counts, route):
+    assert query_counts["small"][route] == query_counts["large"][route]
@@ -0,0 +1,85 @@
+import hashlib
+from functools import wraps
+from flask import current_app, g, request
+from extensions import db
+from models import TableVersion
+
+
+# -------------------------------
+# Per-table Versions
+# -------------------------------
+def bump_versions(*names):
+    """Increment the version of each table in the current transaction.
+
+    Call before commit so the bump is rolled back together with the write.
+    """
+    for name in names:
+        updated = db.session.execute(
+            db.update(TableVersion)
+            .where(TableVersion.name == name)
+            .values(version=TableVersion.version + 1)
+        ).rowcount
+        if not updated:
+            db.session.add(TableVersion(name=name, version=1))
+    db.session.flush()
+
+
+def get_versions(names):
+    rows = db.session.query(TableVersion.name, TableVersion.version).filter(
+        TableVersion.name.in_(names)
+    )
+    versions = dict(rows)
+    return [versions.get(name, 0) for name in names]
+
+
+def table_version(name):
+    """Version of table `name` that the current response is built from.
+
+    Inside a @conditional view this is the version its ETag was computed
+    from, without another query.
+    """
+    versions = g.get("table_versions") or {}
+    if name in versions:
+        return versions[name]
+    return get_versions([name])[0]
+
+
+# -------------------------------
+# Conditional GET
+# -------------------------------
+def conditional(*tables):
+    """Answer If-None-Match with 304 when none of `tables` changed.
+
+    The ETag covers the full request path (including the query string)
+    and the current version of every table the response is built from,
+    so checking it costs a single lookup on table_versions.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = get_versions(tables)
+            g.table_versions = dict(zip(tables, versions))
+            key = f"{request.full_path}|{versions}"
+            etag = hashlib.sha1(key.encode()).hexdigest()
+
+            # A streamed list may be gzipped (streaming.json_array_response),
+            # and a strong ETag must differ per content-coding. For the same
+            # path and versions the coding only depends on Accept-Encoding,
+            # so either tag the client holds is still current.
+            gzip_etag = f"{etag}-gzip"
+            matched = next((tag for tag in (etag, gzip_etag) if request.if_none_match.contains(tag)), None)
+            if matched:
+                response = current_app.response_class(status=304)
+                etag = matched
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                if response.headers.get("Content-Encoding") == "gzip":
+                    etag = gzip_etag
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator